@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.api"
+
+    def ready(self):
+        import apps.api.signals
+        from apps.api.indexes import create_indexes
+        from apps.api.triggers import create_change_log_triggers
+
+        # Sent by the apps owning the indexed models, not by this one
+        post_migrate.connect(create_indexes, dispatch_uid="api_create_indexes")
+        post_migrate.connect(
+            create_change_log_triggers,
+            dispatch_uid="api_create_change_log_triggers",
+        )
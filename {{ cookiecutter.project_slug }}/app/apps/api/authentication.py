@@ -0,0 +1,101 @@
+import time
+from hmac import compare_digest
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.api.models import ApiToken
+
+# Verified tokens are kept in the shared cache by digest, with the version of
+# their user's tokens at the time. ``forget_tokens`` bumps the version, so a
+# revoked token or a deactivated user is rejected right away by every process.
+CACHE_TIMEOUT = 60
+
+
+def _get_version(user_id):
+    key = f"api_tokens_version_{user_id}"
+    version = cache.get(key)
+    if version is None:
+        # A lost version must not match tokens cached before it was lost
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _get_cached_token(digest):
+    entry = cache.get(f"api_token_{digest}")
+    if entry is None:
+        return None
+    version, token = entry
+    if version != _get_version(token.user_id):
+        return None
+    return token
+
+
+def _cache_token(digest, token):
+    cache.set(
+        f"api_token_{digest}", (_get_version(token.user_id), token), CACHE_TIMEOUT
+    )
+
+
+def forget_tokens(user_id):
+    """Makes the cached tokens of a user stale, in every process."""
+    cache.set(f"api_tokens_version_{user_id}", time.time_ns(), None)
+
+
+class ApiTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates requests sent with ``Authorization: Token <key>``.
+
+    A key is checked with one SHA-256 digest, against a token looked up by
+    the key's prefix. Verified tokens are kept in the cache for
+    ``CACHE_TIMEOUT`` seconds, so most requests don't query the database.
+    """
+
+    keyword = "Token"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed(_("Invalid token header."))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_("Invalid token header."))
+
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        digest = ApiToken.get_digest(key)
+        token = _get_cached_token(digest)
+
+        if token is None:
+            prefix = key.partition(".")[0]
+            token = (
+                ApiToken.objects.select_related("user")
+                .filter(prefix=prefix[: ApiToken.PREFIX_LENGTH])
+                .first()
+            )
+            if token is None or not compare_digest(token.digest, digest):
+                raise AuthenticationFailed(_("Invalid token."))
+
+            # Written at most once per cache timeout
+            token.last_used_at = timezone.now()
+            ApiToken.objects.filter(pk=token.pk).update(last_used_at=token.last_used_at)
+            _cache_token(digest, token)
+
+        if token.is_expired:
+            raise AuthenticationFailed(_("Token has expired."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+
+        return token.user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,237 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.http.request import RawPostDataException
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.utils.translation import get_language
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from apps.api.custom.exceptions import IdempotencyKeyInUse, IdempotencyKeyMismatch
+from apps.api.custom.serializers import get_field_selection
+from apps.api.models import IdempotencyKey
+from apps.api.utils.versions import get_data_version
+
+
+class SparseFieldsetMixin:
+    """
+    Lets ``get_queryset`` skip joins for fields the client didn't ask for.
+
+    Pairs with ``DynamicFieldsMixin`` on the serializer side.
+    """
+
+    def get_field_selection(self):
+        if not hasattr(self, "_field_selection"):
+            self._field_selection = get_field_selection(getattr(self, "request", None))
+        return self._field_selection
+
+    def field_requested(self, name):
+        requested, omitted, _ = self.get_field_selection()
+        return (requested is None or name in requested) and name not in omitted
+
+    def field_expanded(self, name):
+        _, _, expanded = self.get_field_selection()
+        return name in expanded and self.field_requested(name)
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETags and ``If-None-Match`` handling for ``list`` and ``retrieve``.
+
+    The ETag is derived from the data version of ``etag_models`` (every table
+    the response reads from), the user, the full URL and the language, so a
+    matching poll is answered with a 304 before the queryset is evaluated or
+    serialized.
+    """
+
+    etag_models = None
+
+    def get_etag_models(self):
+        return self.etag_models or [self.queryset.model]
+
+    def get_data_version(self):
+        if not hasattr(self, "_data_version"):
+            self._data_version = get_data_version(*self.get_etag_models())
+        return self._data_version
+
+    def get_etag(self, request):
+        version = self.get_data_version()
+        if version is None:
+            return None
+
+        key = "|".join(
+            [
+                version,
+                str(request.user.pk),
+                request.get_full_path(),
+                request.accepted_media_type or "",
+                get_language() or "",
+            ]
+        )
+        return '"%s"' % hashlib.sha256(key.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def _detach(data):
+    """Copies serializer output without the serializer and instances."""
+    if isinstance(data, dict):
+        return {key: _detach(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_detach(value) for value in data]
+    return data
+
+
+class ReferenceDataCacheMixin:
+    """
+    Keeps the serialized ``list`` and ``retrieve`` output in this process.
+
+    For data that rarely changes. Entries are per user and URL, and are
+    reused while the data version of ``etag_models`` (read from the shared
+    cache) is unchanged, so a hit runs no query and no serializer. Use after
+    ``ConditionalGetMixin``.
+    """
+
+    reference_cache_size = 256
+
+    _reference_cache = OrderedDict()
+    _reference_cache_lock = threading.Lock()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        version = self.get_data_version()
+        if version is None:
+            return handler(request, *args, **kwargs)
+
+        key = (
+            type(self),
+            request.user.pk,
+            request.build_absolute_uri(),
+            get_language(),
+        )
+        cache = self._reference_cache
+        with self._reference_cache_lock:
+            entry = cache.get(key)
+            if entry is not None and entry[0] == version:
+                cache.move_to_end(key)
+                return Response(entry[1])
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            with self._reference_cache_lock:
+                cache[key] = (version, _detach(response.data))
+                cache.move_to_end(key)
+                while len(cache) > self.reference_cache_size:
+                    cache.popitem(last=False)
+        return response
+
+
+class _Replay(Exception):
+    def __init__(self, record):
+        self.record = record
+
+
+class IdempotencyMixin:
+    """
+    Honors the ``Idempotency-Key`` header on writes.
+
+    The first successful response for a key is stored, and retries of the
+    same request are answered with it without running the write again. A
+    retry arriving while the first request is still running gets a 409, and
+    reusing a key for a different request gets a 422. Failed writes release
+    the key so they can be retried.
+    """
+
+    idempotency_header = "Idempotency-Key"
+
+    def initial(self, request, *args, **kwargs):
+        self.idempotency_key = None
+        super().initial(request, *args, **kwargs)
+
+        key = request.headers.get(self.idempotency_header)
+        if (
+            not key
+            or request.method in SAFE_METHODS
+            or not request.user.is_authenticated
+        ):
+            return
+        if len(key) > 255:
+            raise ValidationError(
+                {self.idempotency_header: _("Use at most 255 characters.")}
+            )
+
+        fingerprint = self.get_request_fingerprint(request)
+        record, created = IdempotencyKey.claim(request.user, key, fingerprint)
+        if created:
+            self.idempotency_key = record
+        elif record is None or record.status_code is None:
+            raise IdempotencyKeyInUse()
+        elif record.fingerprint != fingerprint:
+            raise IdempotencyKeyMismatch()
+        else:
+            raise _Replay(record)
+
+    def get_request_fingerprint(self, request):
+        try:
+            body = request._request.body
+        except RawPostDataException:
+            body = repr(request.data).encode()
+
+        digest = hashlib.sha256()
+        for part in (request.method.encode(), request.get_full_path().encode(), body):
+            digest.update(part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Replay):
+            return exc.record.to_response()
+
+        if getattr(self, "idempotency_key", None) is not None:
+            self.idempotency_key.delete()
+            self.idempotency_key = None
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        record = getattr(self, "idempotency_key", None)
+        if record is not None:
+            self.idempotency_key = None
+            if status.is_success(response.status_code):
+                if hasattr(response, "render"):
+                    response.render()
+                record.store(response)
+            else:
+                record.delete()
+        return response
@@ -1,6 +1,209 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
+
+
+class KeysetOptInPagination(CustomPageNumberPagination):
+    """
+    Page number pagination by default, keyset (cursor) pagination on request.
+
+    Clients opt in with ``?pagination=cursor`` (or by following a ``cursor``
+    link) and may pick one of the view's ``keyset_orderings`` with
+    ``?ordering=``. Pages are fetched with a ``WHERE (a, b) > (x, y)`` style
+    filter instead of ``OFFSET``, and no ``COUNT(*)`` is issued, so every page
+    costs the same no matter how deep the client goes. Keyset fields must be
+    non-nullable, end in a unique field and share a single direction.
+    """
+
+    mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.use_keyset = (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.keyset_page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_keyset_ordering(request, view)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["d"] == "p"
+
+        order_by = self.ordering
+        if reverse:
+            order_by = [self._flip(field) for field in self.ordering]
+        queryset = queryset.order_by(*order_by)
+
+        if cursor is not None:
+            position = self._parse_position(queryset.model, cursor["p"])
+            queryset = queryset.filter(
+                self._after(position, descending=self.descending != reverse)
+            )
+
+        results = list(queryset[: self.keyset_page_size + 1])
+        has_more = len(results) > self.keyset_page_size
+        results = results[: self.keyset_page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.first_position = self._position(results[0]) if results else None
+        self.last_position = self._position(results[-1]) if results else None
+        if not results and cursor is not None:
+            # Empty page past either end: keep the incoming cursor so the
+            # client can still walk back.
+            self.first_position = self.last_position = cursor["p"]
+
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position, "n")
+
+    def get_previous_link(self):
+        if not self.use_keyset:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, "p")
+
+    def get_keyset_ordering(self, request, view):
+        orderings = getattr(view, "keyset_orderings", None) or {"-id": ("-id",)}
+        name = request.query_params.get(self.ordering_query_param)
+        if name in orderings:
+            return list(orderings[name])
+        return list(next(iter(orderings.values())))
+
+    def encode_cursor(self, position, direction):
+        payload = json.dumps({"p": position, "d": direction}, separators=(",", ":"))
+        token = urlsafe_b64encode(payload.encode()).decode()
+        url = remove_query_param(self.base_url, "page")
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(token.encode()))
+            if cursor["d"] not in ("n", "p") or len(cursor["p"]) != len(self.fields):
+                raise ValueError
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return cursor
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        orderings = getattr(view, "keyset_orderings", None) or {"-id": ("-id",)}
+        parameters += [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(
+                    _("Set to 'cursor' to use keyset pagination instead of pages.")
+                ),
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(_("The pagination cursor value.")),
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(_("Ordering used by cursor pagination.")),
+                "schema": {"type": "string", "enum": list(orderings)},
+            },
+        ]
+        return parameters
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _position(self, instance):
+        position = []
+        for field in self.fields:
+            value = getattr(instance, field)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return position
+
+    def _parse_position(self, model, values):
+        try:
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, position, descending):
+        """
+        Builds ``(f1, f2, ...) > (v1, v2, ...)`` (or ``<``) as a Q object.
+
+        The leading ``f1 >= v1`` bound is redundant, but it lets the database
+        start the index range scan at the cursor instead of filtering from the
+        first row.
+        """
+        op = "lt" if descending else "gt"
+        bound = "lte" if descending else "gte"
+
+        branches = []
+        for i, field in enumerate(self.fields):
+            equal = [Q(**{f: position[j]}) for j, f in enumerate(self.fields[:i])]
+            branches.append(
+                reduce(and_, equal + [Q(**{f"{field}__{op}": position[i]})])
+            )
+
+        return Q(**{f"{self.fields[0]}__{bound}": position[0]}) & reduce(or_, branches)
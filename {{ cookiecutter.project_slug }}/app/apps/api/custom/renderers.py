@@ -0,0 +1,105 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data, option=0):
+    """
+    Encodes ``data`` to JSON bytes with orjson.
+
+    Types orjson doesn't know (Decimal, lazy strings, datetimes...) go through
+    DRF's encoder so the output matches what ``JSONRenderer`` would produce.
+    """
+    return orjson.dumps(
+        data, default=_fallback_encoder.default, option=ORJSON_OPTIONS | option
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in ``JSONRenderer`` that encodes with orjson.
+
+    Indented output (browsable API, ``; indent=`` in the Accept header) and
+    the ``UNICODE_JSON=False``/``COMPACT_JSON=False`` settings are left to
+    DRF's renderer, which supports them.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        # Keep the output a strict javascript subset, like JSONRenderer does
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    Compact layout for bulk reads, selected with ``?format=columnar``.
+
+    Lists are rendered as ``{"columns": [...], "rows": [[...], ...]}`` so key
+    names are sent once. Nested objects that carry an ``id`` (accounts,
+    categories, tags...) are replaced by that id in the rows and emitted once
+    per id under ``"related"``. Pagination keys are kept as they are, and
+    anything that isn't a list (details, errors) is rendered unchanged.
+    """
+
+    media_type = "application/vnd.columnar+json"
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(
+            self.to_columnar(data), accepted_media_type, renderer_context
+        )
+
+    def to_columnar(self, data):
+        if isinstance(data, list):
+            return self.build_table(data)
+        if isinstance(data, dict) and isinstance(data.get("results"), list):
+            table = self.build_table(data["results"])
+            return {
+                **{key: value for key, value in data.items() if key != "results"},
+                **table,
+            }
+        return data
+
+    def build_table(self, rows):
+        columns = list(rows[0].keys()) if rows else []
+        related = {}
+
+        table_rows = []
+        for row in rows:
+            table_rows.append(
+                [self.hoist(related, column, row.get(column)) for column in columns]
+            )
+
+        table = {"columns": columns, "rows": table_rows}
+        if related:
+            table["related"] = related
+        return table
+
+    def hoist(self, related, column, value):
+        if isinstance(value, dict) and "id" in value:
+            related.setdefault(column, {}).setdefault(str(value["id"]), value)
+            return value["id"]
+        if isinstance(value, list) and all(
+            isinstance(item, dict) and "id" in item for item in value
+        ):
+            return [self.hoist(related, column, item) for item in value]
+        return value
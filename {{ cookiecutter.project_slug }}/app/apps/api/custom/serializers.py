@@ -0,0 +1,58 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _split(value):
+    return {item.strip() for item in (value or "").split(",") if item.strip()}
+
+
+def get_field_selection(request):
+    """
+    Parses ``?fields=``, ``?omit=`` and ``?expand=`` from the request.
+
+    Returns a ``(fields, omit, expand)`` tuple of sets, ``fields`` being
+    ``None`` when the client didn't restrict the output. Selections only apply
+    to reads; writes always see the full serializer.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set(), set()
+
+    params = request.query_params
+    fields = _split(params.get("fields")) or None
+    return fields, _split(params.get("omit")), _split(params.get("expand"))
+
+
+class DynamicFieldsMixin:
+    """
+    Lets API clients pick the top-level fields of a response.
+
+    ``?fields=a,b`` keeps only those fields, ``?omit=c`` drops fields and
+    ``?expand=d`` replaces a primary key with the nested object declared in
+    ``Meta.expandable_fields`` (``{"name": (SerializerClass, kwargs)}``). Only
+    the outermost serializer is affected, nested serializers keep their shape.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if not self._is_top_level():
+            return fields
+
+        requested, omitted, expanded = get_field_selection(self.context.get("request"))
+
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name in expanded & set(expandable):
+            serializer_class, kwargs = expandable[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+
+        for name in list(fields):
+            if (requested is not None and name not in requested) or name in omitted:
+                fields.pop(name)
+
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        if parent is None:
+            return True
+        return isinstance(parent, serializers.ListSerializer) and parent.parent is None
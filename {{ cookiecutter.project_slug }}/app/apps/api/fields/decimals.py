@@ -0,0 +1,85 @@
+import decimal
+
+from rest_framework import serializers
+from rest_framework.fields import get_attribute
+from rest_framework.settings import api_settings
+
+
+def round_decimal(value, places, rounding=None):
+    """Rounds ``value`` to ``places`` decimal places, whatever its magnitude."""
+    if not isinstance(value, decimal.Decimal):
+        value = decimal.Decimal(str(value))
+    if not value.is_finite():
+        return value
+
+    context = decimal.Context(prec=max(value.adjusted() + places + 2, 1))
+    return value.quantize(
+        decimal.Decimal(1).scaleb(-places),
+        rounding=rounding or decimal.ROUND_HALF_UP,
+        context=context,
+    )
+
+
+def format_decimal(value, places=None, rounding=None):
+    """
+    Formats ``value`` as a plain string without trailing zeros.
+
+    When ``places`` is given the value is rounded to that many decimal places
+    first, so ``Decimal("12.345000000000000000000000000000")`` with 2 places
+    becomes ``"12.35"`` (``"12.345"`` without).
+    """
+    if value is None:
+        return None
+    if not isinstance(value, decimal.Decimal):
+        value = decimal.Decimal(str(value))
+    if not value.is_finite():
+        return str(value)
+
+    if places is not None:
+        value = round_decimal(value, places, rounding)
+
+    text = format(value, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class TrimmedDecimalField(serializers.DecimalField):
+    """
+    DecimalField that outputs as few digits as the value needs.
+
+    Reads are rounded to ``output_places`` or to the ``decimal_places`` of the
+    currency found at ``currency`` (a dotted path from the instance, e.g.
+    ``"account.currency"``), and trailing zeros are dropped. Without either,
+    only the trailing zeros are dropped. Writes behave like DecimalField.
+    """
+
+    def __init__(self, *, output_places=None, currency=None, **kwargs):
+        kwargs.setdefault("max_digits", 42)
+        kwargs.setdefault("decimal_places", 30)
+        self.output_places = output_places
+        self.currency = currency.split(".") if currency else None
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        value = super().get_attribute(instance)
+
+        places = self.output_places
+        if self.currency is not None:
+            currency = get_attribute(instance, self.currency)
+            if currency is not None:
+                places = currency.decimal_places
+
+        return value, places
+
+    def to_representation(self, value):
+        places = self.output_places
+        if isinstance(value, tuple):
+            value, places = value
+        if value is None:
+            return None
+
+        text = format_decimal(value, places, self.rounding)
+        if getattr(self, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING):
+            return text
+        return decimal.Decimal(text)
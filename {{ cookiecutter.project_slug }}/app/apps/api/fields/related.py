@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+
+def preload_related(serializer, field_name, items, *related):
+    """
+    Loads the objects referenced by ``field_name`` in every item at once.
+
+    Lookups made by the field while validating ``items`` are then answered
+    from memory. The field's own queryset is used, so visibility rules apply
+    just like for single lookups.
+    """
+    field = serializer.fields[field_name]
+
+    pks = set()
+    for item in items:
+        if isinstance(item, dict) and not isinstance(item.get(field_name), bool):
+            try:
+                pks.add(int(item.get(field_name)))
+            except (TypeError, ValueError):
+                pass
+
+    queryset = field.get_queryset().select_related(*related)
+    preloaded = serializer.context.setdefault("preloaded", {})
+    preloaded[queryset.model] = queryset.in_bulk(pks)
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that reads objects loaded by ``preload_related``.
+
+    Falls back to a regular query for ids that weren't preloaded.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {}).get(self.get_queryset().model)
+        if preloaded and not isinstance(data, bool):
+            try:
+                instance = preloaded.get(int(data))
+            except (TypeError, ValueError):
+                instance = None
+            if instance is not None:
+                return instance
+        return super().to_internal_value(data)
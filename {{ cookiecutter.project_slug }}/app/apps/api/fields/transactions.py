@@ -1,6 +1,7 @@
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
+from apps.api.utils.related_names import get_name_resolver
 from apps.transactions.models import (
     TransactionCategory,
     TransactionTag,
@@ -19,20 +20,18 @@ class TransactionCategoryField(serializers.Field):
         return {"id": value.id, "name": value.name}
 
     def to_internal_value(self, data):
+        resolver = get_name_resolver(self.context)
         if isinstance(data, int):
-            try:
-                return TransactionCategory.objects.get(pk=data)
-            except TransactionCategory.DoesNotExist:
+            category = resolver.get_by_id(TransactionCategory, data)
+            if category is None:
                 raise serializers.ValidationError(
                     _("Category with this ID does not exist.")
                 )
-        elif isinstance(data, str):
-            try:
-                category = TransactionCategory.objects.get(name=data)
-            except TransactionCategory.DoesNotExist:
-                category = TransactionCategory(name=data)
-                category.save()
             return category
+        elif isinstance(data, str):
+            category = resolver.get_by_name(TransactionCategory, data)
+            if category is not None:
+                return category
         raise serializers.ValidationError(
             _("Invalid category data. Provide an ID or name.")
         )
@@ -60,22 +59,22 @@ class TransactionTagField(serializers.Field):
         return [{"id": tag.id, "name": tag.name} for tag in value.all()]
 
     def to_internal_value(self, data):
+        resolver = get_name_resolver(self.context)
+        resolver.resolve(TransactionTag, data)
+
         tags = []
         for item in data:
             if isinstance(item, int):
-                try:
-                    tag = TransactionTag.objects.get(pk=item)
-                except TransactionTag.DoesNotExist:
+                tag = resolver.get_by_id(TransactionTag, item)
+                if tag is None:
                     raise serializers.ValidationError(
                         _("Tag with this ID does not exist.")
                     )
             elif isinstance(item, str):
-                try:
-                    tag = TransactionTag.objects.get(name=item)
-                except TransactionTag.DoesNotExist:
-                    tag = TransactionTag(name=item)
-                    tag.save()
+                tag = resolver.get_by_name(TransactionTag, item)
             else:
+                tag = None
+            if tag is None:
                 raise serializers.ValidationError(
                     _("Invalid tag data. Provide an ID or name.")
                 )
@@ -95,22 +94,22 @@ class TransactionEntityField(serializers.Field):
         return [{"id": entity.id, "name": entity.name} for entity in value.all()]
 
     def to_internal_value(self, data):
+        resolver = get_name_resolver(self.context)
+        resolver.resolve(TransactionEntity, data)
+
         entities = []
         for item in data:
             if isinstance(item, int):
-                try:
-                    entity = TransactionEntity.objects.get(pk=item)
-                except TransactionEntity.DoesNotExist:
+                entity = resolver.get_by_id(TransactionEntity, item)
+                if entity is None:
                     raise serializers.ValidationError(
                         _("Entity with this ID does not exist.")
                     )
             elif isinstance(item, str):
-                try:
-                    entity = TransactionEntity.objects.get(name=item)
-                except TransactionEntity.DoesNotExist:
-                    entity = TransactionEntity(name=item)
-                    entity.save()
+                entity = resolver.get_by_name(TransactionEntity, item)
             else:
+                entity = None
+            if entity is None:
                 raise serializers.ValidationError(
                     _("Invalid entity data. Provide an ID or name.")
                 )
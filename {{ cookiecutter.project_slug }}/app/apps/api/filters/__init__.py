@@ -0,0 +1,3 @@
+from .transactions import *
+from .currencies import *
+from .dca import *
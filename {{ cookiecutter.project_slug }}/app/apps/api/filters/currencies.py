@@ -0,0 +1,14 @@
+import django_filters
+
+from apps.api.filters.transactions import NumberInFilter
+from apps.currencies.models import ExchangeRate
+
+
+class ExchangeRateFilter(django_filters.FilterSet):
+    date = django_filters.DateTimeFromToRangeFilter()
+    from_currency = NumberInFilter(field_name="from_currency_id")
+    to_currency = NumberInFilter(field_name="to_currency_id")
+
+    class Meta:
+        model = ExchangeRate
+        fields = []
@@ -0,0 +1,13 @@
+import django_filters
+
+from apps.api.filters.transactions import NumberInFilter
+from apps.dca.models import DCAEntry
+
+
+class DCAEntryFilter(django_filters.FilterSet):
+    date = django_filters.DateFromToRangeFilter()
+    strategy = NumberInFilter(field_name="strategy_id")
+
+    class Meta:
+        model = DCAEntry
+        fields = []
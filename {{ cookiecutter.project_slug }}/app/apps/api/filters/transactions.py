@@ -0,0 +1,48 @@
+import django_filters
+
+from apps.transactions.models import (
+    InstallmentPlan,
+    RecurringTransaction,
+    Transaction,
+)
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """Matches any of a comma separated list of ids, e.g. ``?account=1,2``."""
+
+
+class TransactionFilter(django_filters.FilterSet):
+    date = django_filters.DateFromToRangeFilter()
+    reference_date = django_filters.DateFromToRangeFilter()
+    account = NumberInFilter(field_name="account_id")
+    category = NumberInFilter(field_name="category_id")
+    tags = NumberInFilter(field_name="tags", distinct=True)
+    entities = NumberInFilter(field_name="entities", distinct=True)
+
+    class Meta:
+        model = Transaction
+        fields = ["type", "is_paid"]
+
+
+class InstallmentPlanFilter(django_filters.FilterSet):
+    start_date = django_filters.DateFromToRangeFilter()
+    account = NumberInFilter(field_name="account_id")
+    category = NumberInFilter(field_name="category_id")
+    tags = NumberInFilter(field_name="tags", distinct=True)
+    entities = NumberInFilter(field_name="entities", distinct=True)
+
+    class Meta:
+        model = InstallmentPlan
+        fields = ["type"]
+
+
+class RecurringTransactionFilter(django_filters.FilterSet):
+    start_date = django_filters.DateFromToRangeFilter()
+    account = NumberInFilter(field_name="account_id")
+    category = NumberInFilter(field_name="category_id")
+    tags = NumberInFilter(field_name="tags", distinct=True)
+    entities = NumberInFilter(field_name="entities", distinct=True)
+
+    class Meta:
+        model = RecurringTransaction
+        fields = ["type", "is_paused"]
@@ -0,0 +1,97 @@
+import sys
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Composite indexes backing the API filters and orderings, as
+# (index name, app label, model name, fields). The models live in other apps,
+# so these are kept here instead of in their Meta.indexes.
+INDEXES = [
+    (
+        "api_tx_account_date_id",
+        "transactions",
+        "Transaction",
+        ["account", "date", "id"],
+    ),
+    ("api_tx_date_id", "transactions", "Transaction", ["date", "id"]),
+    (
+        "api_tx_reference_date_id",
+        "transactions",
+        "Transaction",
+        ["reference_date", "id"],
+    ),
+    ("api_tx_category_date", "transactions", "Transaction", ["category", "date"]),
+    (
+        "api_tx_type_paid_date",
+        "transactions",
+        "Transaction",
+        ["type", "is_paid", "date"],
+    ),
+    (
+        "api_tx_tags_tag_tx",
+        "transactions",
+        "Transaction_tags",
+        ["transactiontag", "transaction"],
+    ),
+    (
+        "api_tx_entities_entity_tx",
+        "transactions",
+        "Transaction_entities",
+        ["transactionentity", "transaction"],
+    ),
+    ("api_dcaentry_strategy_date", "dca", "DCAEntry", ["strategy", "date"]),
+]
+
+
+def create_indexes(
+    app_config,
+    apps=None,
+    using=DEFAULT_DB_ALIAS,
+    verbosity=1,
+    stdout=None,
+    **kwargs,
+):
+    """
+    Creates the missing ``INDEXES`` of ``app_config`` after it's migrated.
+
+    Indexes are built with ``CREATE INDEX CONCURRENTLY`` so existing tables
+    stay writable. This is a no-op once they exist, and a build that failed
+    half way (left INVALID by PostgreSQL) is dropped and retried.
+    """
+    indexes = [index for index in INDEXES if index[1] == app_config.label]
+    connection = connections[using]
+    if not indexes or connection.vendor != "postgresql" or apps is None:
+        return
+
+    quote = connection.ops.quote_name
+    tables = set(connection.introspection.table_names())
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = ANY(%s)",
+            [[name for name, *_ in indexes]],
+        )
+        existing = dict(cursor.fetchall())
+
+        for name, app_label, model_name, field_names in indexes:
+            if existing.get(name):
+                continue
+
+            try:
+                model = apps.get_model(app_label, model_name)
+                columns = [model._meta.get_field(f).column for f in field_names]
+            except (LookupError, FieldDoesNotExist):
+                continue
+            if model._meta.db_table not in tables:
+                continue
+
+            if name in existing:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}")
+            if verbosity >= 2:
+                (stdout or sys.stdout).write(f"Creating index {name}\n")
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} "
+                f"ON {quote(model._meta.db_table)} "
+                f"({', '.join(quote(column) for column in columns)})"
+            )
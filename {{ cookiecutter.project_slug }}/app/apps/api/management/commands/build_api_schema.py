@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.api.views import CachedSpectacularAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema served at /api/schema/ for the current "
+        "APP_VERSION, so the first requests don't have to."
+    )
+
+    media_types = [
+        "application/vnd.oai.openapi",
+        "application/vnd.oai.openapi+json",
+    ]
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stdout.write("DEBUG is on, the schema isn't cached. Skipping.")
+            return
+        if settings.APP_VERSION == "unknown":
+            self.stdout.write(
+                self.style.WARNING(
+                    "APP_VERSION isn't set, the schema is only cached for "
+                    f"{CachedSpectacularAPIView.unversioned_timeout} seconds."
+                )
+            )
+
+        view = CachedSpectacularAPIView.as_view()
+        for media_type in self.media_types:
+            request = RequestFactory().get("/api/schema/", HTTP_ACCEPT=media_type)
+            try:
+                response = view(request)
+            except Exception as e:
+                # Left to be generated on first use
+                self.stdout.write(
+                    self.style.WARNING(f"Couldn't build {media_type} schema: {e}")
+                )
+                continue
+
+            if response.status_code == 200:
+                self.stdout.write(self.style.SUCCESS(f"Built {media_type} schema"))
+            else:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Couldn't build {media_type} schema "
+                        f"(status {response.status_code})"
+                    )
+                )
@@ -0,0 +1,268 @@
+import hashlib
+import secrets
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Func, Q
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response to an API write sent with an ``Idempotency-Key`` header.
+
+    A row is claimed before the write runs and holds no response until it
+    finishes, so concurrent retries can tell a write in progress from one
+    that's done.
+    """
+
+    TTL = timedelta(hours=24)
+    # Claims left without a response for this long belong to writes that
+    # died half way, and can be taken over
+    IN_PROGRESS_TIMEOUT = timedelta(minutes=5)
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_idempotency_keys",
+    )
+    key = models.CharField(max_length=255, verbose_name=_("Key"))
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    content = models.BinaryField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Idempotency key")
+        verbose_name_plural = _("Idempotency keys")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="api_idempotencykey_unique_user_key"
+            ),
+        ]
+
+    def __str__(self):
+        return self.key
+
+    @classmethod
+    def claim(cls, user, key, fingerprint):
+        """
+        Returns ``(record, created)``. ``record`` is ``None`` if the key was
+        released by a concurrent request while being looked up.
+        """
+        now = timezone.now()
+        cls.objects.filter(
+            Q(created_at__lt=now - cls.TTL)
+            | Q(status_code=None, created_at__lt=now - cls.IN_PROGRESS_TIMEOUT),
+            user=user,
+            key=key,
+        ).delete()
+
+        try:
+            with transaction.atomic():
+                return (
+                    cls.objects.create(user=user, key=key, fingerprint=fingerprint),
+                    True,
+                )
+        except IntegrityError:
+            return cls.objects.filter(user=user, key=key).first(), False
+
+    def store(self, response):
+        self.status_code = response.status_code
+        self.content_type = response.get("Content-Type", "")
+        self.content = zlib.compress(response.content)
+        self.save(update_fields=["status_code", "content_type", "content"])
+
+    def to_response(self):
+        response = HttpResponse(
+            zlib.decompress(self.content),
+            status=self.status_code,
+            content_type=self.content_type,
+        )
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+
+class TransactionExternalReference(models.Model):
+    """
+    Id given to a transaction by an importer, unique per owner.
+
+    Lets sync clients send their own ids to ``/api/transactions/upsert/``
+    instead of keeping a mapping to ours.
+    """
+
+    # First key of the advisory locks taken while upserting, the second one
+    # is the owner's id
+    LOCK_NAMESPACE = 7301
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_transaction_references",
+    )
+    external_id = models.CharField(max_length=255, verbose_name=_("External ID"))
+    transaction = models.OneToOneField(
+        "transactions.Transaction",
+        on_delete=models.CASCADE,
+        related_name="api_external_reference",
+    )
+
+    class Meta:
+        verbose_name = _("Transaction external reference")
+        verbose_name_plural = _("Transaction external references")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "external_id"],
+                name="api_transactionexternalreference_unique_owner_external_id",
+            ),
+        ]
+
+    def __str__(self):
+        return self.external_id
+
+    @classmethod
+    def lock(cls, owner):
+        """
+        Serializes upserts of the same owner until the end of the current
+        transaction, so a new external id can't be inserted twice.
+        """
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s, %s)",
+                    [cls.LOCK_NAMESPACE, owner.pk],
+                )
+
+
+class CurrentTransactionId(Func):
+    """Id of the current database transaction, as a bigint (PostgreSQL)."""
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+class ChangeLog(models.Model):
+    """
+    One row per change made to a synced object and user who could see it,
+    read by ``/api/sync/``. ``user`` is empty when every user could.
+
+    Rows are written by database triggers (see ``apps.api.triggers``), so
+    bulk writes and changes made outside the API are recorded too.
+
+    Rows are ordered by the id of the database transaction that wrote them.
+    Transactions older than the oldest one still running can't add rows
+    anymore, which makes ``(txid, id)`` a safe position to resume from even
+    though rows are committed out of order.
+    """
+
+    class Action(models.TextChoices):
+        CREATED = "created", _("Created")
+        UPDATED = "updated", _("Updated")
+        DELETED = "deleted", _("Deleted")
+
+    RETENTION = timedelta(days=30)
+
+    id = models.BigAutoField(primary_key=True)
+    txid = models.BigIntegerField(db_default=CurrentTransactionId())
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+    )
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=7, choices=Action.choices)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Change log entry")
+        verbose_name_plural = _("Change log entries")
+        indexes = [
+            models.Index(
+                fields=["user", "txid", "id"], name="api_changelog_user_txid_id"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
+
+    @classmethod
+    def for_user(cls, user):
+        return cls.objects.filter(Q(user=user) | Q(user__isnull=True))
+
+    @staticmethod
+    def get_horizon():
+        """
+        Returns the id of the oldest database transaction still running, or
+        of the next one if there's none. Every row with a lower ``txid`` is
+        already visible.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+            )
+            return cursor.fetchone()[0]
+
+
+class ApiToken(models.Model):
+    """
+    Key used to authenticate API requests with ``Authorization: Token <key>``.
+
+    Only a SHA-256 digest of the key is stored, the key itself is shown once
+    when the token is created. Keys are random, so a fast digest is as safe
+    here as a slow password hash.
+    """
+
+    class Scope(models.TextChoices):
+        READ = "read", _("Read only")
+        WRITE = "write", _("Read and write")
+
+    PREFIX_LENGTH = 8
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_tokens",
+    )
+    name = models.CharField(max_length=100, verbose_name=_("Name"))
+    prefix = models.CharField(max_length=PREFIX_LENGTH, unique=True, editable=False)
+    digest = models.CharField(max_length=64, editable=False)
+    scope = models.CharField(
+        max_length=5,
+        choices=Scope.choices,
+        default=Scope.WRITE,
+        verbose_name=_("Scope"),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
+    expires_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Expires at")
+    )
+
+    class Meta:
+        verbose_name = _("API token")
+        verbose_name_plural = _("API tokens")
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix})"
+
+    @staticmethod
+    def get_digest(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def generate_key(self):
+        """Sets a new key and returns it. It can't be read back later."""
+        self.prefix = secrets.token_hex(self.PREFIX_LENGTH // 2)
+        key = f"{self.prefix}.{secrets.token_urlsafe(32)}"
+        self.digest = self.get_digest(key)
+        return key
+
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= timezone.now()
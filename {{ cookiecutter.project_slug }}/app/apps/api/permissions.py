@@ -1,6 +1,18 @@
-from rest_framework.permissions import BasePermission
+import time
+
+from django.core.cache import cache
+from rest_framework.permissions import (
+    SAFE_METHODS,
+    BasePermission,
+    DjangoModelPermissions,
+)
 from django.conf import settings
 
+from apps.api.models import ApiToken
+
+PERMISSIONS_VERSION_KEY = "api_permissions_version"
+PERMISSIONS_TIMEOUT = 60 * 60 * 24
+
 
 class NotInDemoMode(BasePermission):
     def has_permission(self, request, view):
@@ -8,3 +20,65 @@ class NotInDemoMode(BasePermission):
             return False
         else:
             return True
+
+
+class TokenHasScope(BasePermission):
+    """Requests authenticated by a read only API token can't write."""
+
+    def has_permission(self, request, view):
+        if isinstance(request.auth, ApiToken):
+            return (
+                request.auth.scope == ApiToken.Scope.WRITE
+                or request.method in SAFE_METHODS
+            )
+        return True
+
+
+def invalidate_permissions():
+    """Makes every cached permission set stale."""
+    cache.set(PERMISSIONS_VERSION_KEY, time.time_ns(), None)
+
+
+def get_cached_permissions(user):
+    """
+    Returns the user's permissions from the cache, or loads and caches them.
+
+    Sets are stored with the version they were loaded at, and are only used
+    while it's still the current one.
+    """
+    key = f"api_permissions_{user.pk}"
+    cached = cache.get_many([PERMISSIONS_VERSION_KEY, key])
+
+    version = cached.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        # A lost version must not match sets cached before it was lost
+        cache.add(PERMISSIONS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+
+    if key in cached and cached[key][0] == version:
+        return cached[key][1]
+
+    permissions = user.get_all_permissions()
+    cache.set(key, (version, permissions), PERMISSIONS_TIMEOUT)
+    return permissions
+
+
+class CachedDjangoModelPermissions(DjangoModelPermissions):
+    """
+    DjangoModelPermissions reading the user's permissions from the cache.
+
+    The set is put where ModelBackend memoizes it, so the regular
+    ``has_perms`` check runs without queries.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if (
+            user
+            and user.is_authenticated
+            and user.is_active
+            and not user.is_superuser
+            and not hasattr(user, "_perm_cache")
+        ):
+            user._perm_cache = get_cached_permissions(user)
+        return super().has_permission(request, view)
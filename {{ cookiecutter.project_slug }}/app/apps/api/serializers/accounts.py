@@ -2,12 +2,13 @@ from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
 
+from apps.api.custom.serializers import DynamicFieldsMixin
 from apps.api.serializers.currencies import CurrencySerializer
 from apps.accounts.models import AccountGroup, Account
 from apps.currencies.models import Currency
 
 
-class AccountGroupSerializer(serializers.ModelSerializer):
+class AccountGroupSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     permission_classes = [IsAuthenticated]
 
     class Meta:
@@ -15,7 +16,7 @@ class AccountGroupSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     group = AccountGroupSerializer(read_only=True)
     group_id = serializers.PrimaryKeyRelatedField(
         queryset=AccountGroup.objects.all(),
@@ -55,7 +56,8 @@ class AccountSerializer(serializers.ModelSerializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         request = self.context.get("request")
-        if request and request.user.is_authenticated:
+        # group_id is left out by ?fields= and ?omit=
+        if request and request.user.is_authenticated and "group_id" in self.fields:
             # Reload the queryset to get an updated version with the requesting user
             self.fields["group_id"].queryset = AccountGroup.objects.all()
 
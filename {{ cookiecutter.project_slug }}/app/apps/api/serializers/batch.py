@@ -0,0 +1,7 @@
+from rest_framework import serializers
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=serializers.CharField(), allow_empty=False, max_length=20
+    )
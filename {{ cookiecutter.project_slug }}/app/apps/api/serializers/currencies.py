@@ -1,10 +1,14 @@
+import datetime
+
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
 
+from apps.api.custom.serializers import DynamicFieldsMixin
 from apps.currencies.models import Currency, ExchangeRate
 
 
-class CurrencySerializer(serializers.ModelSerializer):
+class CurrencySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     permission_classes = [IsAuthenticated]
 
     class Meta:
@@ -12,7 +16,7 @@ class CurrencySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class ExchangeRateSerializer(serializers.ModelSerializer):
+class ExchangeRateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # For read operations (GET)
     from_currency = CurrencySerializer(read_only=True)
 
@@ -33,3 +37,44 @@ class ExchangeRateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExchangeRate
         fields = "__all__"
+
+
+class ExchangeRateLookupSerializer(serializers.Serializer):
+    max_dates = 1000
+
+    from_currency = serializers.IntegerField()
+    to_currency = serializers.IntegerField()
+    # Comma separated dates or datetimes
+    date = serializers.CharField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate_date(self, value):
+        field = serializers.DateTimeField()
+        return [field.run_validation(item.strip()) for item in value.split(",")]
+
+    def validate(self, data):
+        if "date" in data:
+            dates = data["date"]
+        elif "start" in data and "end" in data:
+            if data["end"] < data["start"]:
+                raise serializers.ValidationError(
+                    {"end": _("Must be on or after start.")}
+                )
+            dates = [
+                data["start"] + datetime.timedelta(days=day)
+                for day in range(
+                    min((data["end"] - data["start"]).days + 1, self.max_dates + 1)
+                )
+            ]
+        else:
+            raise serializers.ValidationError(
+                _("Either 'date' or 'start' and 'end' must be provided.")
+            )
+
+        if not dates or len(dates) > self.max_dates:
+            raise serializers.ValidationError(
+                _("Ask for between 1 and %(max)s dates.") % {"max": self.max_dates}
+            )
+        data["dates"] = dates
+        return data
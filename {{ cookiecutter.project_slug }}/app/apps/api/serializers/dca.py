@@ -1,22 +1,21 @@
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
 
+from apps.api.custom.serializers import DynamicFieldsMixin
+from apps.api.fields.decimals import TrimmedDecimalField
+from apps.api.serializers.currencies import CurrencySerializer
 from apps.dca.models import DCAEntry, DCAStrategy
 
 
-class DCAEntrySerializer(serializers.ModelSerializer):
-    profit_loss = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
+class DCAEntrySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    profit_loss = TrimmedDecimalField(
+        currency="strategy.payment_currency", read_only=True
     )
-    profit_loss_percentage = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    current_value = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    entry_price = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
+    profit_loss_percentage = TrimmedDecimalField(output_places=2, read_only=True)
+    current_value = TrimmedDecimalField(
+        currency="strategy.payment_currency", read_only=True
     )
+    entry_price = TrimmedDecimalField(read_only=True)
 
     permission_classes = [IsAuthenticated]
 
@@ -38,28 +37,33 @@ class DCAEntrySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at", "updated_at"]
 
+    # Amounts are trimmed to the precision of their currency
+    amount_currencies = {
+        "amount_paid": "strategy.payment_currency",
+        "amount_received": "strategy.target_currency",
+    }
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field
+        )
+        if field_name in self.amount_currencies:
+            field_class = TrimmedDecimalField
+            field_kwargs["currency"] = self.amount_currencies[field_name]
+        return field_class, field_kwargs
 
-class DCAStrategySerializer(serializers.ModelSerializer):
+
+class DCAStrategySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     entries = DCAEntrySerializer(many=True, read_only=True)
-    total_invested = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    total_received = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    average_entry_price = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
+    total_invested = TrimmedDecimalField(currency="payment_currency", read_only=True)
+    total_received = TrimmedDecimalField(currency="target_currency", read_only=True)
+    average_entry_price = TrimmedDecimalField(read_only=True)
     total_entries = serializers.IntegerField(read_only=True)
-    current_total_value = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    total_profit_loss = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
-    )
-    total_profit_loss_percentage = serializers.DecimalField(
-        max_digits=42, decimal_places=30, read_only=True
+    current_total_value = TrimmedDecimalField(
+        currency="payment_currency", read_only=True
     )
+    total_profit_loss = TrimmedDecimalField(currency="payment_currency", read_only=True)
+    total_profit_loss_percentage = TrimmedDecimalField(output_places=2, read_only=True)
 
     permission_classes = [IsAuthenticated]
 
@@ -83,3 +87,7 @@ class DCAStrategySerializer(serializers.ModelSerializer):
             "total_profit_loss_percentage",
         ]
         read_only_fields = ["created_at", "updated_at"]
+        expandable_fields = {
+            "target_currency": (CurrencySerializer, {}),
+            "payment_currency": (CurrencySerializer, {}),
+        }
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from apps.api.models import ApiToken
+
+
+class ApiTokenSerializer(serializers.ModelSerializer):
+    # Only set in the response to the creation
+    key = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ApiToken
+        fields = [
+            "id",
+            "name",
+            "prefix",
+            "scope",
+            "created_at",
+            "last_used_at",
+            "expires_at",
+            "key",
+        ]
+        read_only_fields = ["prefix", "created_at", "last_used_at"]
+
+    def get_key(self, obj) -> str | None:
+        return getattr(obj, "key", None)
+
+    def create(self, validated_data):
+        token = ApiToken(**validated_data)
+        token.key = token.generate_key()
+        token.save()
+        return token
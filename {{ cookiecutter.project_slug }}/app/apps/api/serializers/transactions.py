@@ -1,5 +1,6 @@
-from decimal import Decimal
+from collections import defaultdict
 
+from django.db import transaction as db_transaction
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular import openapi
 from drf_spectacular.types import OpenApiTypes
@@ -14,7 +15,15 @@ from apps.api.fields.transactions import (
     TransactionCategoryField,
     TransactionEntityField,
 )
+from apps.api.custom.serializers import DynamicFieldsMixin
+from apps.api.fields.decimals import TrimmedDecimalField, round_decimal
+from apps.api.fields.related import PreloadedPrimaryKeyRelatedField, preload_related
+from apps.api.models import TransactionExternalReference
 from apps.api.serializers.accounts import AccountSerializer
+from apps.api.tasks import defer_materialization
+from apps.api.utils.bulk import has_field
+from apps.api.utils.exchange_rates import get_rate_resolver
+from apps.api.utils.related_names import get_name_resolver
 from apps.transactions.models import (
     Transaction,
     TransactionCategory,
@@ -23,10 +32,11 @@ from apps.transactions.models import (
     TransactionEntity,
     RecurringTransaction,
 )
+from apps.common.functions.decimals import truncate_decimal
 from apps.common.middleware.thread_local import get_current_user
 
 
-class TransactionCategorySerializer(serializers.ModelSerializer):
+class TransactionCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     permission_classes = [IsAuthenticated]
 
     class Meta:
@@ -38,7 +48,7 @@ class TransactionCategorySerializer(serializers.ModelSerializer):
         ]
 
 
-class TransactionTagSerializer(serializers.ModelSerializer):
+class TransactionTagSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     permission_classes = [IsAuthenticated]
 
     class Meta:
@@ -50,7 +60,7 @@ class TransactionTagSerializer(serializers.ModelSerializer):
         ]
 
 
-class TransactionEntitySerializer(serializers.ModelSerializer):
+class TransactionEntitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     permission_classes = [IsAuthenticated]
 
     class Meta:
@@ -62,7 +72,21 @@ class TransactionEntitySerializer(serializers.ModelSerializer):
         ]
 
 
-class InstallmentPlanSerializer(serializers.ModelSerializer):
+class MaterializationJobMixin(serializers.Serializer):
+    """
+    Exposes the id of the job deferred by a write to create or update the
+    object's transactions, to be followed at ``/api/jobs/<id>/``.
+    """
+
+    job = serializers.SerializerMethodField()
+
+    def get_job(self, obj) -> int | None:
+        return getattr(obj, "materialization_job_id", None)
+
+
+class InstallmentPlanSerializer(
+    MaterializationJobMixin, DynamicFieldsMixin, serializers.ModelSerializer
+):
     category: str | int = TransactionCategoryField(required=False)
     tags: str | int = TransactionTagField(required=False)
     entities: str | int = TransactionEntityField(required=False)
@@ -88,21 +112,29 @@ class InstallmentPlanSerializer(serializers.ModelSerializer):
             "tags",
             "entities",
             "notes",
+            "job",
         ]
         read_only_fields = ["installment_total_number", "end_date"]
+        expandable_fields = {"account": (AccountSerializer, {})}
 
     def create(self, validated_data):
-        instance = super().create(validated_data)
-        instance.create_transactions()
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            instance = super().create(validated_data)
+            instance.materialization_job_id = defer_materialization(instance, "create")
         return instance
 
     def update(self, instance, validated_data):
-        instance = super().update(instance, validated_data)
-        instance.update_transactions()
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            instance = super().update(instance, validated_data)
+            instance.materialization_job_id = defer_materialization(instance, "update")
         return instance
 
 
-class RecurringTransactionSerializer(serializers.ModelSerializer):
+class RecurringTransactionSerializer(
+    MaterializationJobMixin, DynamicFieldsMixin, serializers.ModelSerializer
+):
     category: str | int = TransactionCategoryField(required=False)
     tags: str | int = TransactionTagField(required=False)
     entities: str | int = TransactionEntityField(required=False)
@@ -127,22 +159,122 @@ class RecurringTransactionSerializer(serializers.ModelSerializer):
             "recurrence_interval",
             "last_generated_date",
             "last_generated_reference_date",
+            "job",
         ]
         read_only_fields = ["last_generated_date", "last_generated_reference_date"]
+        expandable_fields = {"account": (AccountSerializer, {})}
 
     def create(self, validated_data):
-        instance = super().create(validated_data)
-        instance.create_upcoming_transactions()
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            instance = super().create(validated_data)
+            instance.materialization_job_id = defer_materialization(instance, "create")
         return instance
 
     def update(self, instance, validated_data):
-        instance = super().update(instance, validated_data)
-        instance.update_unpaid_transactions()
-        instance.generate_upcoming_transactions()
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            instance = super().update(instance, validated_data)
+            instance.materialization_job_id = defer_materialization(instance, "update")
         return instance
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionListSerializer(serializers.ListSerializer):
+    bulk_batch_size = 1000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            preload_related(self.child, "account_id", data, "currency")
+            self.preload_names(data)
+        return super().to_internal_value(data)
+
+    def preload_names(self, data):
+        """
+        Looks up the categories, tags and entities of the whole batch.
+
+        Missing names are only created by ``create``, once every item is valid.
+        """
+        items = [item for item in data if isinstance(item, dict)]
+        resolver = get_name_resolver(self.context)
+
+        resolver.resolve(TransactionCategory, [item.get("category") for item in items])
+        for name, model in (("tags", TransactionTag), ("entities", TransactionEntity)):
+            resolver.resolve(
+                model,
+                [
+                    value
+                    for item in items
+                    if isinstance(item.get(name), list)
+                    for value in item[name]
+                ],
+            )
+
+    def create(self, validated_data):
+        """
+        Inserts the whole batch with ``bulk_create``.
+
+        ``save()`` isn't called, so what it does for a single transaction
+        (owner, amount truncation) is done here.
+        """
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            transactions, m2m = self.build_transactions(validated_data)
+            Transaction.objects.bulk_create(
+                transactions, batch_size=self.bulk_batch_size
+            )
+            self.save_m2m(transactions, m2m)
+
+        return transactions
+
+    def build_transactions(self, validated_data):
+        owner = get_current_user()
+        transactions = []
+        m2m = {"tags": [], "entities": []}
+
+        for data in validated_data:
+            for name, values in m2m.items():
+                values.append(data.pop(name, []))
+
+            transaction = Transaction(**data)
+            transaction.amount = truncate_decimal(
+                value=transaction.amount,
+                decimal_places=transaction.account.currency.decimal_places,
+            )
+            if not transaction.owner_id and owner and owner.is_authenticated:
+                transaction.owner = owner
+            transactions.append(transaction)
+
+        return transactions, m2m
+
+    def save_m2m(self, transactions, m2m, replace=False):
+        for name, values in m2m.items():
+            field = Transaction._meta.get_field(name)
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+
+            if replace:
+                through.objects.filter(
+                    **{f"{source}__in": [t.pk for t in transactions]}
+                ).delete()
+            through.objects.bulk_create(
+                [
+                    through(**{source: transaction.pk, target: related.pk})
+                    for transaction, related_objects in zip(transactions, values)
+                    for related in related_objects
+                ],
+                batch_size=self.bulk_batch_size,
+                ignore_conflicts=True,
+            )
+
+    def to_representation(self, data):
+        rows = list(data.all() if hasattr(data, "all") else data)
+        if "exchanged_amount" in self.child.fields:
+            self.child.prefetch_exchange_rates(rows)
+        return super().to_representation(rows)
+
+
+class TransactionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     category: str | int = TransactionCategoryField(required=False)
     tags: str | int = TransactionTagField(required=False)
     entities: str | int = TransactionEntityField(required=False)
@@ -153,7 +285,7 @@ class TransactionSerializer(serializers.ModelSerializer):
     account = AccountSerializer(read_only=True)
 
     # For write operations (POST, PUT, PATCH)
-    account_id = serializers.PrimaryKeyRelatedField(
+    account_id = PreloadedPrimaryKeyRelatedField(
         queryset=Account.objects.all(), source="account", write_only=True
     )
 
@@ -175,11 +307,29 @@ class TransactionSerializer(serializers.ModelSerializer):
             "deleted_at",
             "deleted",
         ]
+        expandable_fields = {
+            "installment_plan": (InstallmentPlanSerializer, {}),
+            "recurring_transaction": (RecurringTransactionSerializer, {}),
+        }
+        list_serializer_class = TransactionListSerializer
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.fields["account_id"].queryset = Account.objects.all()
+        # Left out by ?fields= and ?omit=
+        if "account_id" in self.fields:
+            self.fields["account_id"].queryset = Account.objects.all()
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field
+        )
+        if field_name == "amount":
+            # Amounts are stored with 30 places but are only meaningful up to
+            # the account currency's precision
+            field_class = TrimmedDecimalField
+            field_kwargs["currency"] = "account.currency"
+        return field_class, field_kwargs
 
     def validate(self, data):
         if not self.partial:
@@ -196,25 +346,170 @@ class TransactionSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
         entities = validated_data.pop("entities", [])
-        transaction = Transaction.objects.create(**validated_data)
-        transaction.tags.set(tags)
-        transaction.entities.set(entities)
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            transaction = Transaction.objects.create(**validated_data)
+            transaction.tags.set(tags)
+            transaction.entities.set(entities)
         return transaction
 
     def update(self, instance, validated_data):
         tags = validated_data.pop("tags", None)
         entities = validated_data.pop("entities", None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-        if tags is not None:
-            instance.tags.set(tags)
-        if entities is not None:
-            instance.entities.set(entities)
+            if tags is not None:
+                instance.tags.set(tags)
+            if entities is not None:
+                instance.entities.set(entities)
 
         return instance
 
-    @staticmethod
-    def get_exchanged_amount(obj) -> Decimal:
-        return obj.exchanged_amount()
+    def prefetch_exchange_rates(self, transactions):
+        """Loads the rates needed by ``exchanged_amount`` for a page at once."""
+        pairs, dates = set(), set()
+        for transaction in transactions:
+            account = transaction.account
+            if account.exchange_currency_id:
+                pairs.add((account.currency_id, account.exchange_currency_id))
+                dates.add(transaction.date)
+
+        if pairs:
+            get_rate_resolver(self.context).prefetch(pairs, dates)
+
+    def get_exchanged_amount(self, obj) -> dict | None:
+        account = obj.account
+        if not account.exchange_currency_id:
+            return None
+
+        exchanged = get_rate_resolver(self.context).convert(
+            obj.amount, account.currency, account.exchange_currency, obj.date
+        )
+        if exchanged is None:
+            return None
+
+        exchanged["amount"] = round_decimal(
+            exchanged["amount"], exchanged["decimal_places"]
+        )
+        return exchanged
+
+
+class TransactionBulkSelectionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+
+    def validate(self, data):
+        if "ids" not in data and "filter" not in data:
+            raise serializers.ValidationError(
+                _("Either 'ids' or 'filter' must be provided.")
+            )
+        return data
+
+
+class TransactionBulkUpdateSerializer(TransactionBulkSelectionSerializer):
+    changes = serializers.DictField(allow_empty=False)
+
+
+class TransactionUpsertListSerializer(TransactionListSerializer):
+    def validate(self, attrs):
+        seen = set()
+        for data in attrs:
+            if data["external_id"] in seen:
+                raise serializers.ValidationError(
+                    _("Duplicated external_id: %(external_id)s.")
+                    % {"external_id": data["external_id"]}
+                )
+            seen.add(data["external_id"])
+        return attrs
+
+    def upsert(self, validated_data):
+        """
+        Creates or updates the batch by ``external_id``, returning
+        ``(transactions, created)`` where ``created`` is a list of booleans.
+
+        Known ids are mapped to their transactions with one query. New rows
+        are inserted at once, and known ones are written by one ``INSERT ...
+        ON CONFLICT (id) DO UPDATE`` per set of fields sent, so what an item
+        leaves out keeps its value. Soft deleted transactions are restored.
+        """
+        owner = get_current_user()
+        external_ids = [data.pop("external_id") for data in validated_data]
+        sent_fields = [set(data) - {"owner"} for data in validated_data]
+        # Written on every update
+        touched_fields = [
+            name for name in ("updated_at", "deleted", "deleted_at") if has_field(name)
+        ]
+
+        with db_transaction.atomic():
+            get_name_resolver(self.context).save_pending()
+            transactions, m2m = self.build_transactions(validated_data)
+
+            TransactionExternalReference.lock(owner)
+            known = dict(
+                TransactionExternalReference.objects.filter(
+                    owner=owner, external_id__in=external_ids
+                ).values_list("external_id", "transaction_id")
+            )
+            created = [external_id not in known for external_id in external_ids]
+
+            updates = defaultdict(list)
+            for transaction, external_id, fields in zip(
+                transactions, external_ids, sent_fields
+            ):
+                if external_id in known:
+                    transaction.pk = known[external_id]
+                    updates[frozenset(fields - m2m.keys())].append(transaction)
+
+            Transaction.objects.bulk_create(
+                [t for t, is_new in zip(transactions, created) if is_new],
+                batch_size=self.bulk_batch_size,
+            )
+            for fields, group in updates.items():
+                Transaction.objects.bulk_create(
+                    group,
+                    batch_size=self.bulk_batch_size,
+                    update_conflicts=True,
+                    unique_fields=["id"],
+                    update_fields=sorted(fields) + touched_fields,
+                )
+
+            TransactionExternalReference.objects.bulk_create(
+                [
+                    TransactionExternalReference(
+                        owner=owner, external_id=external_id, transaction=transaction
+                    )
+                    for transaction, external_id, is_new in zip(
+                        transactions, external_ids, created
+                    )
+                    if is_new
+                ],
+                batch_size=self.bulk_batch_size,
+            )
+            for name, values in m2m.items():
+                rows = [
+                    (transaction, related_objects)
+                    for transaction, related_objects, fields, is_new in zip(
+                        transactions, values, sent_fields, created
+                    )
+                    if is_new or name in fields
+                ]
+                self.save_m2m(
+                    [transaction for transaction, _ in rows],
+                    {name: [related_objects for _, related_objects in rows]},
+                    replace=bool(known),
+                )
+
+        return transactions, created
+
+
+class TransactionUpsertSerializer(TransactionSerializer):
+    external_id = serializers.CharField(max_length=255, write_only=True)
+
+    class Meta(TransactionSerializer.Meta):
+        list_serializer_class = TransactionUpsertListSerializer
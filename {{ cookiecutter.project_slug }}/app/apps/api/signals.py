@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.api.authentication import forget_tokens
+from apps.api.models import ApiToken
+from apps.api.permissions import invalidate_permissions
+
+User = get_user_model()
+
+# Sent once per bulk operation instead of once per transaction, with
+# sender=Transaction and ``pks``, the ids of every affected transaction.
+# ``transactions_updated`` also gets ``fields``, the names of the changed
+# fields, and ``transactions_deleted`` gets ``soft``, whether the rows were
+# only marked as deleted.
+transactions_created = Signal()
+transactions_updated = Signal()
+transactions_deleted = Signal()
+
+
+@receiver(post_save, sender=ApiToken)
+@receiver(post_delete, sender=ApiToken)
+def forget_api_token(sender, instance, **kwargs):
+    forget_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def forget_user_api_tokens(sender, instance, **kwargs):
+    forget_tokens(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions_on_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_permissions()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_permissions_on_delete(sender, **kwargs):
+    invalidate_permissions()
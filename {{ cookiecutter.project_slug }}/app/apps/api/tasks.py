@@ -0,0 +1,230 @@
+import logging
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from procrastinate.contrib.django import app
+from procrastinate.exceptions import AlreadyEnqueued
+
+from apps.api.models import ChangeLog, IdempotencyKey
+from apps.common.middleware.thread_local import (
+    delete_current_user,
+    get_current_user,
+    write_current_user,
+)
+from apps.rules.signals import transaction_created, transaction_updated
+from apps.transactions.models import (
+    InstallmentPlan,
+    RecurringTransaction,
+    Transaction,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_PROGRESS_TIMEOUT = 60 * 60 * 24
+
+TRANSACTION_EVENTS = {
+    "created": transaction_created,
+    "updated": transaction_updated,
+}
+
+
+def send_transaction_event(transaction, event):
+    """
+    Sends the rules signal for ``event`` ("created" or "updated").
+
+    With ``DEFER_TRANSACTION_RULES`` on, the signal is sent by a worker once
+    the surrounding database transaction commits instead. Events of the same
+    kind for a transaction are coalesced while the first one is still waiting
+    to run, which is at least ``TRANSACTION_RULES_COALESCE_SECONDS``.
+    """
+    if not settings.DEFER_TRANSACTION_RULES:
+        TRANSACTION_EVENTS[event].send(sender=transaction)
+        return
+
+    user = get_current_user()
+    user_id = user.pk if user and user.is_authenticated else None
+    db_transaction.on_commit(
+        partial(_defer_transaction_event, transaction.pk, event, user_id)
+    )
+
+
+def _defer_transaction_event(transaction_id, event, user_id):
+    try:
+        dispatch_transaction_event.configure(
+            queueing_lock=f"transaction_{event}_{transaction_id}",
+            schedule_in={"seconds": settings.TRANSACTION_RULES_COALESCE_SECONDS},
+        ).defer(transaction_id=transaction_id, event=event, user_id=user_id)
+    except AlreadyEnqueued:
+        # The waiting job will read the transaction as it is now
+        pass
+
+
+@contextmanager
+def run_as_user(user_id):
+    """Makes the user-scoped managers see what ``user_id`` sees."""
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    write_current_user(user)
+    try:
+        yield user
+    finally:
+        delete_current_user()
+
+
+def get_job_progress(job_id):
+    return cache.get(f"api_job_progress_{job_id}")
+
+
+def set_job_progress(job_id, completed, total, step=None):
+    cache.set(
+        f"api_job_progress_{job_id}",
+        {"completed": completed, "total": total, "step": step},
+        JOB_PROGRESS_TIMEOUT,
+    )
+
+
+@app.task(name="dispatch_transaction_event")
+def dispatch_transaction_event(transaction_id, event, user_id=None):
+    with run_as_user(user_id):
+        try:
+            transaction = Transaction.objects.filter(pk=transaction_id).first()
+            if transaction is None:
+                # Deleted before the job ran
+                return
+            TRANSACTION_EVENTS[event].send(sender=transaction)
+        except Exception as e:
+            logger.error(
+                "Error while executing 'dispatch_transaction_event' task",
+                exc_info=True,
+            )
+            raise e
+
+
+def defer_materialization(instance, action):
+    """
+    Defers the creation or update of the transactions of an installment plan
+    or recurring transaction, returning the job id.
+
+    Jobs are written through Django's connection, so a job deferred in the
+    ``atomic()`` block saving the object is committed together with it. Jobs
+    for the same object hold the same lock, so they run in order.
+    """
+    user = get_current_user()
+    task = {
+        InstallmentPlan: materialize_installment_plan,
+        RecurringTransaction: materialize_recurring_transaction,
+    }[type(instance)]
+
+    return task.configure(lock=f"{task.name}_{instance.pk}").defer(
+        object_id=instance.pk,
+        action=action,
+        user_id=user.pk if user and user.is_authenticated else None,
+    )
+
+
+@contextmanager
+def track_transactions(job_id, field, object_id, total):
+    """
+    Reports the job's progress each time one of the object's transactions
+    (those with ``field`` set to ``object_id``) is saved, out of ``total``
+    (``None`` when unknown). Yields the progress, whose ``step`` can be set.
+    """
+    progress = {"completed": 0, "total": total, "step": None}
+
+    def count(sender, instance, **kwargs):
+        if getattr(instance, f"{field}_id") == object_id:
+            progress["completed"] += 1
+            set_job_progress(job_id, **progress)
+
+    dispatch_uid = f"api_track_transactions_{job_id}"
+    post_save.connect(count, sender=Transaction, weak=False, dispatch_uid=dispatch_uid)
+    try:
+        yield progress
+    finally:
+        post_save.disconnect(sender=Transaction, dispatch_uid=dispatch_uid)
+
+
+def _materialize(context, model, object_id, action, user_id, steps, field, total=None):
+    job_id = context.job.id
+    with run_as_user(user_id):
+        try:
+            instance = model.objects.filter(pk=object_id).first()
+            if instance is None:
+                # Deleted before the job ran
+                return
+
+            with track_transactions(
+                job_id, field, object_id, total(instance) if total else None
+            ) as progress:
+                for method in steps[action]:
+                    progress["step"] = method
+                    set_job_progress(job_id, **progress)
+                    getattr(instance, method)()
+            set_job_progress(job_id, progress["completed"], progress["completed"])
+        except Exception as e:
+            logger.error(
+                f"Error while executing '{context.job.task_name}' task",
+                exc_info=True,
+            )
+            raise e
+
+
+@app.task(name="materialize_installment_plan", pass_context=True)
+def materialize_installment_plan(context, object_id, action, user_id=None):
+    _materialize(
+        context,
+        InstallmentPlan,
+        object_id,
+        action,
+        user_id,
+        steps={
+            "create": ["create_transactions"],
+            "update": ["update_transactions"],
+        },
+        field="installment_plan",
+        total=lambda installment_plan: installment_plan.number_of_installments,
+    )
+
+
+@app.task(name="materialize_recurring_transaction", pass_context=True)
+def materialize_recurring_transaction(context, object_id, action, user_id=None):
+    _materialize(
+        context,
+        RecurringTransaction,
+        object_id,
+        action,
+        user_id,
+        steps={
+            "create": ["create_upcoming_transactions"],
+            "update": ["update_unpaid_transactions", "generate_upcoming_transactions"],
+        },
+        # How many are generated depends on how far ahead they are
+        field="recurring_transaction",
+    )
+
+
+@app.periodic(cron="0 * * * *")
+@app.task(
+    queueing_lock="remove_expired_idempotency_keys",
+    name="remove_expired_idempotency_keys",
+)
+def remove_expired_idempotency_keys(timestamp=None):
+    IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - IdempotencyKey.TTL
+    ).delete()
+
+
+@app.periodic(cron="30 3 * * *")
+@app.task(
+    queueing_lock="remove_old_change_log_entries",
+    name="remove_old_change_log_entries",
+)
+def remove_old_change_log_entries(timestamp=None):
+    ChangeLog.objects.filter(
+        created_at__lt=timezone.now() - ChangeLog.RETENTION
+    ).delete()
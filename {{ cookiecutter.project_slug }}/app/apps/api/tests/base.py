@@ -0,0 +1,168 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Account, AccountGroup
+from apps.currencies.models import Currency, ExchangeRate
+from apps.dca.models import DCAEntry, DCAStrategy
+from apps.transactions.models import (
+    InstallmentPlan,
+    RecurringTransaction,
+    Transaction,
+    TransactionCategory,
+    TransactionEntity,
+    TransactionTag,
+)
+
+User = get_user_model()
+
+
+@override_settings(
+    CACHALOT_ENABLED=False,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class ApiTestCase(APITestCase):
+    """
+    Logs in as a regular user owning the objects it creates, with the model
+    permissions the API checks, and shares them with ``other_user``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("api@example.com", "password")
+        cls.user.user_permissions.set(
+            Permission.objects.filter(
+                content_type__app_label__in=[
+                    "accounts",
+                    "currencies",
+                    "dca",
+                    "transactions",
+                ]
+            )
+        )
+        cls.other_user = User.objects.create_user("other@example.com", "password")
+        cls.currency = Currency.objects.create(
+            code="BRL", name="Real", decimal_places=2, prefix="R$ "
+        )
+        cls.exchange_currency = Currency.objects.create(
+            code="USD", name="Dollar", decimal_places=2, prefix="$ "
+        )
+        cls.exchange_rate = ExchangeRate.objects.create(
+            from_currency=cls.currency,
+            to_currency=cls.exchange_currency,
+            rate=Decimal("0.2"),
+            date=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.count = 0
+
+    def share(self, obj):
+        obj.shared_with.add(self.other_user)
+        return obj
+
+    def create_account(self):
+        self.count += 1
+        group = self.share(
+            AccountGroup.objects.create(name=f"Group {self.count}", owner=self.user)
+        )
+        return self.share(
+            Account.objects.create(
+                name=f"Account {self.count}",
+                group=group,
+                currency=self.currency,
+                exchange_currency=self.exchange_currency,
+                owner=self.user,
+            )
+        )
+
+    def create_category(self):
+        self.count += 1
+        return self.share(
+            TransactionCategory.objects.create(
+                name=f"Category {self.count}", owner=self.user
+            )
+        )
+
+    def create_tag(self):
+        self.count += 1
+        return self.share(
+            TransactionTag.objects.create(name=f"Tag {self.count}", owner=self.user)
+        )
+
+    def create_entity(self):
+        self.count += 1
+        return self.share(
+            TransactionEntity.objects.create(
+                name=f"Entity {self.count}", owner=self.user
+            )
+        )
+
+    def create_installment_plan(self, account=None):
+        installment_plan = InstallmentPlan.objects.create(
+            account=account or self.create_account(),
+            type=Transaction.Type.EXPENSE,
+            description=f"Installment plan {self.count}",
+            number_of_installments=3,
+            start_date=datetime.date(2024, 1, 1),
+            installment_amount=Decimal("100"),
+            category=self.create_category(),
+        )
+        installment_plan.tags.add(self.create_tag())
+        installment_plan.entities.add(self.create_entity())
+        return installment_plan
+
+    def create_recurring_transaction(self, account=None):
+        recurring_transaction = RecurringTransaction.objects.create(
+            account=account or self.create_account(),
+            type=Transaction.Type.EXPENSE,
+            amount=Decimal("20"),
+            description=f"Recurring transaction {self.count}",
+            start_date=datetime.date(2024, 1, 1),
+            reference_date=datetime.date(2024, 1, 1),
+            recurrence_type=RecurringTransaction.RecurrenceType.MONTH,
+            recurrence_interval=1,
+            category=self.create_category(),
+        )
+        recurring_transaction.tags.add(self.create_tag())
+        recurring_transaction.entities.add(self.create_entity())
+        return recurring_transaction
+
+    def create_dca_entry(self):
+        self.count += 1
+        strategy = self.share(
+            DCAStrategy.objects.create(
+                name=f"Strategy {self.count}",
+                target_currency=self.exchange_currency,
+                payment_currency=self.currency,
+                owner=self.user,
+            )
+        )
+        return DCAEntry.objects.create(
+            strategy=strategy,
+            date=datetime.date(2024, 1, 1),
+            amount_paid=Decimal("50"),
+            amount_received=Decimal("10"),
+        )
+
+    def create_transaction(self, **kwargs):
+        transaction = Transaction.objects.create(
+            account=self.create_account(),
+            type=Transaction.Type.EXPENSE,
+            is_paid=True,
+            date=datetime.date(2024, 1, 1) + datetime.timedelta(days=self.count),
+            reference_date=datetime.date(2024, 1, 1),
+            amount=Decimal("10.50"),
+            description=f"Transaction {self.count}",
+            category=self.create_category(),
+            owner=self.user,
+            **kwargs,
+        )
+        transaction.tags.add(self.create_tag())
+        transaction.entities.add(self.create_entity())
+        return transaction
@@ -0,0 +1,30 @@
+from apps.api.models import ApiToken
+from apps.api.tests.base import ApiTestCase
+
+
+class ApiTokenAuthenticationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.token = ApiToken(user=self.user, name="Test")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.generate_key()}")
+        self.token.save()
+
+    def assertStatus(self, status_code):
+        response = self.client.get("/api/currencies/")
+        self.assertEqual(response.status_code, status_code)
+
+    def test_deleted_token_is_rejected_right_away(self):
+        # The second request is answered from the cache
+        self.assertStatus(200)
+        self.assertStatus(200)
+
+        self.token.delete()
+        self.assertStatus(401)
+
+    def test_deactivated_user_is_rejected_right_away(self):
+        self.assertStatus(200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertStatus(401)
@@ -0,0 +1,67 @@
+from apps.api.models import ChangeLog
+from apps.api.tests.base import ApiTestCase
+from apps.transactions.models import Transaction, TransactionTag
+
+
+class ChangeLogTests(ApiTestCase):
+    """Changes written outside the API are recorded by the triggers."""
+
+    def assertLogged(self, model, pk, action, users):
+        self.assertEqual(
+            set(
+                ChangeLog.objects.filter(
+                    model=model._meta.label_lower, object_id=pk, action=action
+                ).values_list("user_id", flat=True)
+            ),
+            users,
+        )
+
+    def test_queryset_update(self):
+        transaction = self.create_transaction()
+        ChangeLog.objects.all().delete()
+
+        Transaction.objects.filter(pk=transaction.pk).update(description="Updated")
+
+        self.assertLogged(
+            Transaction,
+            transaction.pk,
+            ChangeLog.Action.UPDATED,
+            {self.user.pk, self.other_user.pk},
+        )
+
+    def test_bulk_create_ignoring_conflicts(self):
+        tag = self.create_tag()
+        ChangeLog.objects.all().delete()
+
+        TransactionTag.objects.bulk_create(
+            [
+                TransactionTag(name=tag.name, owner=self.user),
+                TransactionTag(name="New tag", owner=self.user),
+            ],
+            ignore_conflicts=True,
+        )
+
+        self.assertEqual(
+            ChangeLog.objects.filter(action=ChangeLog.Action.CREATED).count(), 1
+        )
+        self.assertLogged(
+            TransactionTag,
+            TransactionTag.objects.get(name="New tag").pk,
+            ChangeLog.Action.CREATED,
+            {self.user.pk},
+        )
+
+    def test_queryset_delete(self):
+        tag = self.create_tag()
+        ChangeLog.objects.all().delete()
+
+        TransactionTag.objects.filter(pk=tag.pk).delete()
+
+        self.assertLogged(
+            TransactionTag, tag.pk, ChangeLog.Action.DELETED, {self.user.pk}
+        )
+        # Its sharing rows go first, /api/sync/ reports the updated object
+        # it can't find anymore as deleted
+        self.assertLogged(
+            TransactionTag, tag.pk, ChangeLog.Action.UPDATED, {self.other_user.pk}
+        )
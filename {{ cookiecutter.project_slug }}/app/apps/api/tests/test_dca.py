@@ -0,0 +1,18 @@
+from apps.api.tests.base import ApiTestCase
+
+
+class DCAEntryTests(ApiTestCase):
+    def test_amounts_keep_model_constraints(self):
+        strategy = self.create_dca_entry().strategy
+        for field in ("amount_paid", "amount_received"):
+            with self.subTest(field=field):
+                data = {
+                    "strategy": strategy.pk,
+                    "date": "2024-01-01",
+                    "amount_paid": "50",
+                    "amount_received": "10",
+                    field: "9" * 50,
+                }
+                response = self.client.post("/api/dca/entries/", data, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
@@ -0,0 +1,63 @@
+from apps.api.tests.base import ApiTestCase
+
+
+class FieldSelectionTests(ApiTestCase):
+    """``?fields=`` and ``?omit=`` on lists and single objects."""
+
+    def assertFields(self, url, fields):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        for row in data.get("results", [data]):
+            self.assertEqual(set(row), fields)
+
+    def test_transaction_fields(self):
+        transaction = self.create_transaction()
+        for url in (
+            "/api/transactions/",
+            f"/api/transactions/{transaction.pk}/",
+        ):
+            with self.subTest(url=url):
+                self.assertFields(f"{url}?fields=id,amount", {"id", "amount"})
+
+    def test_transaction_omit(self):
+        transaction = self.create_transaction()
+        for url in (
+            "/api/transactions/",
+            f"/api/transactions/{transaction.pk}/",
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(f"{url}?omit=account_id,description")
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                for row in data.get("results", [data]):
+                    self.assertIn("id", row)
+                    self.assertNotIn("description", row)
+
+    def test_account_fields(self):
+        account = self.create_account()
+        for url in ("/api/accounts/", f"/api/accounts/{account.pk}/"):
+            with self.subTest(url=url):
+                self.assertFields(f"{url}?fields=id,name", {"id", "name"})
+
+    def test_account_omit(self):
+        account = self.create_account()
+        for url in ("/api/accounts/", f"/api/accounts/{account.pk}/"):
+            with self.subTest(url=url):
+                response = self.client.get(f"{url}?omit=group_id,name")
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                for row in data.get("results", [data]):
+                    self.assertIn("id", row)
+                    self.assertNotIn("name", row)
+
+    def test_writes_see_every_field(self):
+        account = self.create_account()
+        response = self.client.patch(
+            f"/api/accounts/{account.pk}/?fields=id",
+            {"group_id": None},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        account.refresh_from_db()
+        self.assertIsNone(account.group_id)
@@ -0,0 +1,132 @@
+from apps.api.tests.base import ApiTestCase
+
+# Rows created for each list, enough for a query per row to change the count
+ROWS = 3
+
+
+class QueryCountTests(ApiTestCase):
+    """
+    Pins the queries of every list and detail page.
+
+    Lists cost one ``COUNT`` and one page query plus one query per
+    prefetched relation, whatever the number of rows, so a missing
+    ``select_related``/``prefetch_related`` shows up as a different count.
+    Requests are made as a regular owner, so the visibility filters of
+    shared objects are part of the queries.
+    """
+
+    def assertQueries(self, url, count):
+        # Leaves out the queries only made once per process
+        self.client.get(url)
+        with self.assertNumQueries(count):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def assertPageQueries(self, path, create, list_count, detail_count, query=""):
+        objects = [create() for _ in range(ROWS)]
+        self.assertQueries(f"{path}{query}", list_count)
+        self.assertQueries(f"{path}{objects[0].pk}/{query}", detail_count)
+
+    def test_transactions(self):
+        # Rows, tags, entities, the account group's users and the exchange
+        # rates (by pair, for exchanged_amount). The list adds its COUNT.
+        self.assertPageQueries("/api/transactions/", self.create_transaction, 6, 5)
+
+    def test_transactions_with_expanded_plans(self):
+        def create():
+            return self.create_transaction(
+                installment_plan=self.create_installment_plan(),
+                recurring_transaction=self.create_recurring_transaction(),
+            )
+
+        # Tags and entities of both plans on top of test_transactions
+        self.assertPageQueries(
+            "/api/transactions/",
+            create,
+            10,
+            9,
+            query="?expand=installment_plan,recurring_transaction",
+        )
+
+    def test_transactions_by_cursor(self):
+        for _ in range(ROWS):
+            self.create_transaction()
+        # No COUNT
+        self.assertQueries("/api/transactions/?pagination=cursor", 5)
+
+    def test_installment_plans(self):
+        self.assertPageQueries(
+            "/api/installment-plans/", self.create_installment_plan, 4, 3
+        )
+
+    def test_installment_plans_with_expanded_account(self):
+        self.assertPageQueries(
+            "/api/installment-plans/",
+            self.create_installment_plan,
+            5,
+            4,
+            query="?expand=account",
+        )
+
+    def test_recurring_transactions(self):
+        self.assertPageQueries(
+            "/api/recurring-transactions/", self.create_recurring_transaction, 4, 3
+        )
+
+    def test_recurring_transactions_with_expanded_account(self):
+        self.assertPageQueries(
+            "/api/recurring-transactions/",
+            self.create_recurring_transaction,
+            5,
+            4,
+            query="?expand=account",
+        )
+
+    def test_accounts(self):
+        self.assertPageQueries("/api/accounts/", self.create_account, 3, 2)
+
+    def test_account_groups(self):
+        self.assertPageQueries(
+            "/api/account-groups/", lambda: self.create_account().group, 3, 2
+        )
+
+    def test_categories(self):
+        self.assertPageQueries("/api/categories/", self.create_category, 3, 2)
+
+    def test_tags(self):
+        self.assertPageQueries("/api/tags/", self.create_tag, 3, 2)
+
+    def test_entities(self):
+        self.assertPageQueries("/api/entities/", self.create_entity, 3, 2)
+
+    def test_currencies(self):
+        self.assertPageQueries("/api/currencies/", lambda: self.currency, 2, 1)
+
+    def test_exchange_rates(self):
+        self.assertPageQueries(
+            "/api/exchange-rates/",
+            lambda: self.exchange_rate,
+            2,
+            1,
+        )
+
+    # The profit and totals of DCA strategies and entries are model methods
+    # querying per row, so the pages are pinned without them
+
+    def test_dca_strategies(self):
+        self.assertPageQueries(
+            "/api/dca/strategies/",
+            lambda: self.create_dca_entry().strategy,
+            2,
+            1,
+            query="?fields=id,name,target_currency,payment_currency,notes",
+        )
+
+    def test_dca_entries(self):
+        self.assertPageQueries(
+            "/api/dca/entries/",
+            self.create_dca_entry,
+            2,
+            1,
+            query="?fields=id,strategy,date,amount_paid,amount_received,notes",
+        )
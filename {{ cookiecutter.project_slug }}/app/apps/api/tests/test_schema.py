@@ -0,0 +1,29 @@
+from django.utils.cache import has_vary_header
+
+from apps.api.tests.base import ApiTestCase
+
+
+class SchemaTests(ApiTestCase):
+    def get(self, **headers):
+        response = self.client.get("/api/schema/", headers=headers)
+        self.assertTrue(has_vary_header(response, "Accept-Encoding"))
+        return response
+
+    def test_content_encoding(self):
+        for accept_encoding, encoding in [
+            ("gzip", "gzip"),
+            ("x-gzip, br", "gzip"),
+            ("*", "gzip"),
+            ("gzip;q=0", None),
+            ("br, *;q=0", None),
+            ("identity", None),
+        ]:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.get(accept_encoding=accept_encoding)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+        response = self.get(if_none_match=etag, accept_encoding="gzip")
+        self.assertEqual(response.status_code, 304)
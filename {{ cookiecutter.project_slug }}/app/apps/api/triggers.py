@@ -0,0 +1,279 @@
+import sys
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.utils import truncate_name
+
+# Models whose changes are recorded for /api/sync/, as (app label, model
+# name, field holding the shared object deciding who sees them): "" for
+# shared objects themselves, None for models every user sees.
+SYNCED_MODELS = [
+    ("transactions", "Transaction", "account"),
+    ("accounts", "Account", ""),
+    ("transactions", "TransactionCategory", ""),
+    ("transactions", "TransactionTag", ""),
+    ("transactions", "TransactionEntity", ""),
+    ("currencies", "Currency", None),
+    ("currencies", "ExchangeRate", None),
+]
+
+# Whether every user can see a row with these owner_id and visibility
+# columns, like SharedObjectManager decides it
+EVERYONE = "(visibility = 'public' OR owner_id IS NULL)"
+
+
+class TriggerBuilder:
+    """
+    Builds the triggers writing the ``ChangeLog`` of the synced models.
+
+    Triggers are per statement and read the changed rows from transition
+    tables, so a bulk ``update()``, ``bulk_create()`` or ``delete()`` from
+    anywhere costs one more ``INSERT ... SELECT`` and no round trip, and
+    nothing written through the database is missed. Rows are written for
+    every user who could see the object before or after the change.
+    """
+
+    def __init__(self, apps, connection):
+        self.quote = connection.ops.quote_name
+        self.max_name_length = connection.ops.max_name_length()
+
+        change_log = apps.get_model("api", "ChangeLog")
+        self.change_log = self.quote(change_log._meta.db_table)
+        self.change_log_columns = ", ".join(
+            self.column(change_log, name)
+            for name in ("user", "model", "object_id", "action", "created_at")
+        )
+        self.tables = {change_log._meta.db_table}
+
+        self.models = []
+        for app_label, model_name, scope in SYNCED_MODELS:
+            model = apps.get_model(app_label, model_name)
+            self.models.append((model, scope))
+            self.tables.add(model._meta.db_table)
+            if scope == "":
+                self.tables.add(self.through(model)._meta.db_table)
+
+    def column(self, model, name):
+        return self.quote(model._meta.get_field(name).column)
+
+    def table(self, model):
+        return self.quote(model._meta.db_table)
+
+    def through(self, model):
+        return model._meta.get_field("shared_with").remote_field.through
+
+    def shared_model(self, model, scope):
+        return model if not scope else model._meta.get_field(scope).related_model
+
+    def dependents(self, model):
+        """Synced models whose visibility follows ``model``, with their field."""
+        return [
+            (dependent, scope)
+            for dependent, scope in self.models
+            if scope and self.shared_model(dependent, scope) is model
+        ]
+
+    def audience(self, model, scope, rows, shared_rows=None):
+        """
+        ``SELECT object_id, user_id`` for every user who can see the objects
+        of ``model`` in ``rows``, ``user_id`` being NULL when every user can.
+        The shared objects are read from ``shared_rows`` instead of their
+        table when given.
+        """
+        pk = self.column(model, "id")
+        if scope is None:
+            return f"SELECT r.{pk} AS object_id, NULL::bigint AS user_id FROM {rows} r"
+
+        shared = self.shared_model(model, scope)
+        shared_pk = self.column(shared, "id")
+        owner = self.column(shared, "owner")
+        visibility = self.column(shared, "visibility")
+        if scope:
+            scoped = (
+                f"SELECT r.{pk} AS object_id, s.{shared_pk} AS scope_id, "
+                f"s.{owner} AS owner_id, s.{visibility} AS visibility "
+                f"FROM {rows} r JOIN {shared_rows or self.table(shared)} s "
+                f"ON s.{shared_pk} = r.{self.column(model, scope)}"
+            )
+        else:
+            scoped = (
+                f"SELECT r.{pk} AS object_id, r.{pk} AS scope_id, "
+                f"r.{owner} AS owner_id, r.{visibility} AS visibility "
+                f"FROM {rows} r"
+            )
+
+        field = shared._meta.get_field("shared_with")
+        through = self.quote(field.remote_field.through._meta.db_table)
+        through_object = self.quote(field.m2m_column_name())
+        through_user = self.quote(field.m2m_reverse_name())
+        return (
+            f"WITH scoped AS ({scoped}) "
+            f"SELECT object_id, NULL::bigint AS user_id FROM scoped WHERE {EVERYONE} "
+            f"UNION SELECT object_id, owner_id FROM scoped WHERE NOT {EVERYONE} "
+            f"UNION SELECT scoped.object_id, t.{through_user} FROM scoped "
+            f"JOIN {through} t ON t.{through_object} = scoped.scope_id "
+            f"WHERE NOT {EVERYONE}"
+        )
+
+    def insert(self, model, audience, action, join=""):
+        label = model._meta.label_lower.replace("'", "''")
+        return (
+            f"INSERT INTO {self.change_log} ({self.change_log_columns}) "
+            f"SELECT a.user_id, '{label}', a.object_id, {action}, now() "
+            f"FROM ({audience}) a {join}"
+        )
+
+    def model_statements(self, model, scope):
+        """Statements run after each event on ``model``, by event."""
+        pk = self.column(model, "id")
+
+        if any(field.name == "deleted" for field in model._meta.concrete_fields):
+            # Soft deletes are updates of the deleted flag
+            update_action = (
+                f"CASE WHEN n.{self.column(model, 'deleted')} "
+                "THEN 'deleted' ELSE 'updated' END"
+            )
+        else:
+            update_action = "'updated'"
+        # The old rows tell who could see the objects before, who must be
+        # told too when they lost access
+        update = [
+            self.insert(
+                model,
+                self.audience(
+                    model,
+                    scope,
+                    "(SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows)",
+                ),
+                update_action,
+                join=f"JOIN new_rows n ON n.{pk} = a.object_id",
+            )
+        ]
+
+        if scope == "":
+            owner = self.column(model, "owner")
+            visibility = self.column(model, "visibility")
+            changed = (
+                f"SELECT n.{pk} FROM new_rows n JOIN old_rows o ON o.{pk} = n.{pk} "
+                f"WHERE n.{owner} IS DISTINCT FROM o.{owner} "
+                f"OR n.{visibility} IS DISTINCT FROM o.{visibility}"
+            )
+            # Objects following a shared object that changed hands are told
+            # to the users of both its old and new state
+            for dependent, dependent_scope in self.dependents(model):
+                rows = (
+                    f"(SELECT * FROM {self.table(dependent)} "
+                    f"WHERE {self.column(dependent, dependent_scope)} IN ({changed}))"
+                )
+                update.append(
+                    self.insert(
+                        dependent,
+                        f"({self.audience(dependent, dependent_scope, rows)}) UNION "
+                        f"({self.audience(dependent, dependent_scope, rows, 'old_rows')})",
+                        "'updated'",
+                    )
+                )
+
+        return {
+            "INSERT": [
+                self.insert(model, self.audience(model, scope, "new_rows"), "'created'")
+            ],
+            "UPDATE": update,
+            "DELETE": [
+                self.insert(model, self.audience(model, scope, "old_rows"), "'deleted'")
+            ],
+        }
+
+    def sharing_statements(self, model, rows):
+        """
+        Statements recording an update of the objects of ``model``, and of
+        the objects following them, for the users added to or removed from
+        ``shared_with`` in ``rows``.
+        """
+        field = model._meta.get_field("shared_with")
+        through_object = self.quote(field.m2m_column_name())
+        through_user = self.quote(field.m2m_reverse_name())
+
+        statements = [
+            self.insert(
+                model,
+                f"SELECT r.{through_object} AS object_id, "
+                f"r.{through_user} AS user_id FROM {rows} r",
+                "'updated'",
+            )
+        ]
+        for dependent, scope in self.dependents(model):
+            statements.append(
+                self.insert(
+                    dependent,
+                    f"SELECT d.{self.column(dependent, 'id')} AS object_id, "
+                    f"r.{through_user} AS user_id FROM {rows} r "
+                    f"JOIN {self.table(dependent)} d "
+                    f"ON d.{self.column(dependent, scope)} = r.{through_object}",
+                    "'updated'",
+                )
+            )
+        return statements
+
+    def triggers(self):
+        """``(table, event, statements)`` for every trigger."""
+        for model, scope in self.models:
+            for event, statements in self.model_statements(model, scope).items():
+                yield model._meta.db_table, event, statements
+
+            if scope == "":
+                table = self.through(model)._meta.db_table
+                yield table, "INSERT", self.sharing_statements(model, "new_rows")
+                yield table, "DELETE", self.sharing_statements(model, "old_rows")
+
+    def sql(self, table, event, statements):
+        name = self.quote(
+            truncate_name(
+                f"api_changelog_{table}_{event.lower()}", self.max_name_length
+            )
+        )
+        transition = {
+            "INSERT": "NEW TABLE AS new_rows",
+            "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+            "DELETE": "OLD TABLE AS old_rows",
+        }[event]
+        body = "".join(f"    {statement};\n" for statement in statements)
+        return [
+            f"CREATE OR REPLACE FUNCTION {name}() RETURNS trigger "
+            f"LANGUAGE plpgsql AS $$\nBEGIN\n{body}    RETURN NULL;\nEND\n$$",
+            f"DROP TRIGGER IF EXISTS {name} ON {self.quote(table)}",
+            f"CREATE TRIGGER {name} AFTER {event} ON {self.quote(table)} "
+            f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION {name}()",
+        ]
+
+
+def create_change_log_triggers(
+    app_config,
+    apps=None,
+    using=DEFAULT_DB_ALIAS,
+    verbosity=1,
+    stdout=None,
+    **kwargs,
+):
+    """
+    Creates (or replaces) the triggers recording changes to the synced
+    models after migrating, once every table they read exists.
+    """
+    connection = connections[using]
+    if app_config.label != "api" or connection.vendor != "postgresql" or apps is None:
+        return
+
+    try:
+        builder = TriggerBuilder(apps, connection)
+    except LookupError:
+        return
+    if not builder.tables <= set(connection.introspection.table_names()):
+        return
+
+    with connection.cursor() as cursor:
+        for table, event, statements in builder.triggers():
+            if verbosity >= 2:
+                (stdout or sys.stdout).write(
+                    f"Creating change log trigger on {table} ({event})\n"
+                )
+            for sql in builder.sql(table, event, statements):
+                cursor.execute(sql)
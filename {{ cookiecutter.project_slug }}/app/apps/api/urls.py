@@ -16,6 +16,10 @@ router.register(r"currencies", views.CurrencyViewSet)
 router.register(r"exchange-rates", views.ExchangeRateViewSet)
 router.register(r"dca/strategies", views.DCAStrategyViewSet)
 router.register(r"dca/entries", views.DCAEntryViewSet)
+router.register(r"jobs", views.JobViewSet, basename="job")
+router.register(r"sync", views.SyncViewSet, basename="sync")
+router.register(r"tokens", views.ApiTokenViewSet, basename="token")
+router.register(r"batch", views.BatchViewSet, basename="batch")
 
 urlpatterns = [
     path("", include(router.urls)),
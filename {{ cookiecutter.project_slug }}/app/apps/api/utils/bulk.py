@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from apps.transactions.models import Transaction
+
+CHUNK_SIZE = 5000
+
+
+def _chunks(pks):
+    for start in range(0, len(pks), CHUNK_SIZE):
+        yield pks[start : start + CHUNK_SIZE]
+
+
+def has_field(name):
+    """Whether ``Transaction`` has ``name``, which varies between versions."""
+    try:
+        Transaction._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def update_transactions(pks, changes):
+    """
+    Applies ``changes`` to the transactions in ``pks`` with set-based queries.
+
+    Regular fields are written with ``UPDATE``, while tags and entities are
+    replaced with a ``DELETE`` and an ``INSERT`` of the through rows.
+    """
+    changes = dict(changes)
+    m2m = {name: changes.pop(name) for name in ("tags", "entities") if name in changes}
+
+    if "reference_date" in changes:
+        changes["reference_date"] = changes["reference_date"].replace(day=1)
+    if has_field("updated_at"):
+        changes["updated_at"] = timezone.now()
+
+    with db_transaction.atomic():
+        for chunk in _chunks(pks):
+            if changes:
+                Transaction._base_manager.filter(pk__in=chunk).update(**changes)
+
+            for name, related_objects in m2m.items():
+                field = Transaction._meta.get_field(name)
+                through = field.remote_field.through
+                source = f"{field.m2m_field_name()}_id"
+                target = f"{field.m2m_reverse_field_name()}_id"
+
+                through.objects.filter(**{f"{source}__in": chunk}).delete()
+                through.objects.bulk_create(
+                    [
+                        through(**{source: pk, target: related.pk})
+                        for pk in chunk
+                        for related in related_objects
+                    ],
+                    ignore_conflicts=True,
+                )
+
+
+def delete_transactions(pks):
+    """
+    Deletes the transactions in ``pks``, or marks them as deleted when
+    ``ENABLE_SOFT_DELETE`` is on.
+    """
+    with db_transaction.atomic():
+        for chunk in _chunks(pks):
+            transactions = Transaction._base_manager.filter(pk__in=chunk)
+            if settings.ENABLE_SOFT_DELETE:
+                transactions.update(deleted=True, deleted_at=timezone.now())
+            else:
+                transactions.delete()
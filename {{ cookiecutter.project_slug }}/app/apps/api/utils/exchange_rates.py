@@ -0,0 +1,290 @@
+import datetime
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.api.utils.triangulation import RateMatrix, as_day
+from apps.api.utils.versions import get_data_version
+from apps.currencies.models import ExchangeRate
+
+
+def as_datetime(value):
+    """Normalizes dates and naive datetimes to aware datetimes for comparison."""
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _pair_filter(from_id, to_id):
+    return Q(from_currency_id=from_id, to_currency_id=to_id) | Q(
+        from_currency_id=to_id, to_currency_id=from_id
+    )
+
+
+def _pair_key(from_id, to_id):
+    return (from_id, to_id) if from_id <= to_id else (to_id, from_id)
+
+
+def _nearest(timestamps, timestamp, start=0):
+    """
+    Index of the entry closest in time to ``timestamp``, in either direction,
+    like ``apps.currencies.utils.convert.get_exchange_rate`` picks it.
+    """
+    index = bisect_left(timestamps, timestamp, start)
+    if index == len(timestamps):
+        return index - 1
+    if index > 0 and timestamp - timestamps[index - 1] <= timestamps[index] - timestamp:
+        return index - 1
+    return index
+
+
+class RatePair:
+    """
+    Every rate of a currency pair, sorted by date.
+
+    Dates are kept as POSIX timestamps in an ``array`` and rates in the
+    direction of the lower currency id to the higher one.
+    """
+
+    __slots__ = ("key", "timestamps", "rates")
+
+    def __init__(self, key, entries):
+        entries.sort(key=lambda entry: entry[0])
+        self.key = key
+        self.timestamps = array("d", (entry[0] for entry in entries))
+        self.rates = tuple(entry[1] for entry in entries)
+
+    def _oriented(self, rate, from_id):
+        return rate if from_id == self.key[0] else 1 / rate
+
+    def nearest(self, timestamp):
+        """
+        ``(rate, age)`` of the rate closest to ``timestamp``, ``age`` being
+        how far from it the rate was set, in seconds.
+        """
+        if not self.rates:
+            return None
+        index = _nearest(self.timestamps, timestamp)
+        return self.rates[index], abs(self.timestamps[index] - timestamp)
+
+    def rate_at(self, from_id, date) -> Decimal | None:
+        if not self.rates:
+            return None
+        index = _nearest(self.timestamps, as_datetime(date).timestamp())
+        return self._oriented(self.rates[index], from_id)
+
+    def rates_at(self, from_id, dates):
+        """
+        Rates for many dates at once, in the order given.
+
+        The dates are matched in ascending order, each binary search starting
+        where the previous one ended.
+        """
+        if not self.rates:
+            return [None] * len(dates)
+
+        timestamps = [as_datetime(date).timestamp() for date in dates]
+        results = [None] * len(dates)
+        index = 0
+        for position in sorted(range(len(dates)), key=timestamps.__getitem__):
+            index = _nearest(self.timestamps, timestamps[position], index)
+            results[position] = self._oriented(self.rates[index], from_id)
+        return results
+
+
+class RateIndex:
+    """
+    Exchange rates by currency pair, shared by every request of the process.
+
+    Pairs are loaded on first use, all of them with a single query, and kept
+    until an ``ExchangeRate`` is written anywhere. Writes are noticed
+    through the data version in the shared cache, which costs no query.
+    Without a version (cachalot disabled) nothing is kept between calls.
+    """
+
+    def __init__(self):
+        self._pairs = {}
+        self._complete = False
+        self._version = None
+        self._lock = threading.Lock()
+        # Incremented every time the loaded pairs are dropped
+        self.generation = 0
+
+    def _check_version(self, version):
+        if version is None or version != self._version:
+            self._pairs = {}
+            self._complete = False
+            self._version = version
+            self.generation += 1
+
+    def get_pairs(self, pairs):
+        """Returns a ``RatePair`` for each ``(from_id, to_id)`` of ``pairs``."""
+        keys = {_pair_key(from_id, to_id) for from_id, to_id in pairs}
+        version = get_data_version(ExchangeRate)
+
+        with self._lock:
+            self._check_version(version)
+            found = {key: self._pairs[key] for key in keys if key in self._pairs}
+            if self._complete:
+                # Every pair with rates is loaded, the others have none
+                found.update({key: RatePair(key, []) for key in keys - found.keys()})
+
+        missing = keys - found.keys()
+        if missing:
+            loaded = self._load(missing)
+            found.update(loaded)
+            with self._lock:
+                # Loaded rows are only current for the version read above
+                if version is not None and version == self._version:
+                    self._pairs.update(loaded)
+
+        return found
+
+    def get_all_pairs(self):
+        """
+        Returns ``(generation, pairs)`` with a ``RatePair`` for every pair
+        that has rates, loading all of them with one query the first time.
+        """
+        version = get_data_version(ExchangeRate)
+
+        with self._lock:
+            self._check_version(version)
+            if self._complete:
+                return self.generation, dict(self._pairs)
+            generation = self.generation
+
+        loaded = self._load()
+        with self._lock:
+            if version is not None and version == self._version:
+                self._pairs = loaded
+                self._complete = True
+        return generation, loaded
+
+    def get_pair(self, from_id, to_id):
+        return self.get_pairs([(from_id, to_id)])[_pair_key(from_id, to_id)]
+
+    def _load(self, keys=None):
+        rows = ExchangeRate.objects.values_list(
+            "from_currency_id", "to_currency_id", "date", "rate"
+        )
+        if keys is None:
+            entries = defaultdict(list)
+        else:
+            entries = {key: [] for key in keys}
+            rows = rows.filter(reduce(or_, (_pair_filter(*key) for key in keys)))
+
+        for from_id, to_id, date, rate in rows:
+            if not rate or from_id == to_id:
+                continue
+            key = _pair_key(from_id, to_id)
+            entries[key].append(
+                (
+                    as_datetime(date).timestamp(),
+                    rate if from_id == key[0] else 1 / rate,
+                )
+            )
+
+        return {
+            key: RatePair(key, pair_entries) for key, pair_entries in entries.items()
+        }
+
+    def rate_at(self, from_id, to_id, date) -> Decimal | None:
+        if from_id == to_id:
+            return Decimal("1")
+        return self.get_pair(from_id, to_id).rate_at(from_id, date)
+
+    def rates_at(self, from_id, to_id, dates):
+        if from_id == to_id:
+            return [Decimal("1")] * len(dates)
+        return self.get_pair(from_id, to_id).rates_at(from_id, dates)
+
+
+rate_index = RateIndex()
+rate_matrix = RateMatrix(rate_index)
+
+
+class ExchangeRateResolver:
+    """
+    Resolves exchange rates for many rows of a request.
+
+    ``prefetch`` takes the pairs needed by a page from ``rate_index``, which
+    loads the missing ones with one query. Pairs are then held for the rest
+    of the request, so rows keep seeing the same rates. Pairs without rates
+    are converted through other currencies, with ``rate_matrix``.
+    """
+
+    def __init__(self):
+        # (low_id, high_id) -> RatePair
+        self._pairs = {}
+        # day -> DailyRateMatrix
+        self._matrices = {}
+
+    def prefetch(self, pairs, dates=()):
+        """
+        Loads ``pairs`` of currency ids and, when some have no rates of their
+        own, the matrices of the ``dates`` they're converted at, in one pass.
+        """
+        keys = {
+            _pair_key(from_id, to_id)
+            for from_id, to_id in pairs
+            if from_id != to_id and _pair_key(from_id, to_id) not in self._pairs
+        }
+        if keys:
+            self._pairs.update(rate_index.get_pairs(keys))
+
+        if any(
+            not self._pairs[_pair_key(from_id, to_id)].rates
+            for from_id, to_id in pairs
+            if from_id != to_id
+        ):
+            days = {as_day(date) for date in dates} - self._matrices.keys()
+            if days:
+                self._matrices.update(rate_matrix.get_many(days))
+
+    def get_rate(self, from_id, to_id, date) -> Decimal | None:
+        if from_id == to_id:
+            return Decimal("1")
+
+        key = _pair_key(from_id, to_id)
+        if key not in self._pairs:
+            self.prefetch([key])
+        pair = self._pairs[key]
+        if pair.rates:
+            return pair.rate_at(from_id, date)
+
+        day = as_day(date)
+        if day not in self._matrices:
+            self._matrices[day] = rate_matrix.get(day)
+        return self._matrices[day].rate(from_id, to_id)
+
+    def convert(self, amount, from_currency, to_currency, date):
+        """Mirrors ``convert()``, returning ``None`` when no rate can be found."""
+        rate = self.get_rate(from_currency.id, to_currency.id, date)
+        if rate is None:
+            return None
+        return {
+            "amount": amount * rate,
+            "suffix": to_currency.suffix,
+            "prefix": to_currency.prefix,
+            "decimal_places": to_currency.decimal_places,
+        }
+
+
+def get_rate_resolver(context):
+    """Returns the resolver shared by every serializer of the current request."""
+    request = context.get("request")
+    if request is None:
+        return context.setdefault("rate_resolver", ExchangeRateResolver())
+
+    if not hasattr(request, "_rate_resolver"):
+        request._rate_resolver = ExchangeRateResolver()
+    return request._rate_resolver
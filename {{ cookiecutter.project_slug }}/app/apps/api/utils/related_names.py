@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils.text import capfirst
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.common.middleware.thread_local import get_current_user
+
+
+class RelatedNameResolver:
+    """
+    Resolves category, tag and entity ids and names for a whole request.
+
+    Values are looked up with one ``IN`` query per model. Missing names get
+    unsaved objects, which ``save_pending`` creates once the data is valid
+    with a single ``INSERT ... ON CONFLICT DO NOTHING`` and selects again, so
+    concurrent requests creating the same name end up sharing one row.
+    Resolved objects are kept for the rest of the request.
+    """
+
+    def __init__(self):
+        self._by_id = defaultdict(dict)
+        self._by_name = defaultdict(dict)
+        self._missing_ids = defaultdict(set)
+        # Unsaved objects for names that don't exist yet, by name
+        self._pending = defaultdict(dict)
+
+    def resolve(self, model, values):
+        ids, names = set(), set()
+        for value in values:
+            if isinstance(value, str):
+                names.add(value)
+            elif isinstance(value, int) and not isinstance(value, bool):
+                ids.add(value)
+
+        ids -= self._by_id[model].keys() | self._missing_ids[model]
+        names -= self._by_name[model].keys() | self._pending[model].keys()
+        if ids or names:
+            self._store(model, model.objects.filter(Q(pk__in=ids) | Q(name__in=names)))
+            self._missing_ids[model] |= ids - self._by_id[model].keys()
+
+        missing_names = names - self._by_name[model].keys()
+        if missing_names:
+            user = get_current_user()
+            owner = user if user and user.is_authenticated else None
+            for name in missing_names:
+                self._pending[model][name] = model(name=name, owner=owner)
+
+    def save_pending(self):
+        """
+        Creates the objects handed out for missing names, setting their ids.
+
+        Call it in the same database transaction as the rows referencing
+        them, once they are valid. Returns the objects by model, some of
+        which may have been created first by a concurrent request. Raises a
+        ``ValidationError`` for names taken meanwhile by an object the user
+        can't see.
+        """
+        saved = {}
+        for model, pending in self._pending.items():
+            if not pending:
+                continue
+
+            model.objects.bulk_create(
+                [pending[name] for name in sorted(pending)], ignore_conflicts=True
+            )
+            self._store(model, model.objects.filter(name__in=pending.keys()))
+            # The conflicting row belongs to someone the user can't see
+            hidden = sorted(pending.keys() - self._by_name[model].keys())
+            if hidden:
+                raise serializers.ValidationError(
+                    [
+                        _('%(model)s "%(name)s" already exists.')
+                        % {"model": capfirst(model._meta.verbose_name), "name": name}
+                        for name in hidden
+                    ]
+                )
+
+            for name, instance in pending.items():
+                stored = self._by_name[model][name]
+                instance.pk = stored.pk
+                instance.owner_id = stored.owner_id
+                instance._state.adding = False
+                instance._state.db = stored._state.db
+            saved[model] = list(pending.values())
+
+        self._pending.clear()
+        return saved
+
+    def _store(self, model, queryset):
+        user = get_current_user()
+        user_id = user.pk if user and user.is_authenticated else None
+
+        for instance in queryset.order_by("id"):
+            self._by_id[model][instance.pk] = instance
+            # Names are unique per owner, prefer the user's own object over
+            # one shared with them
+            if instance.name not in self._by_name[model] or (
+                user_id is not None and instance.owner_id == user_id
+            ):
+                self._by_name[model][instance.name] = instance
+
+    def get_by_id(self, model, pk):
+        self.resolve(model, [pk])
+        return self._by_id[model].get(pk)
+
+    def get_by_name(self, model, name):
+        """The object named ``name``, unsaved if it doesn't exist yet."""
+        self.resolve(model, [name])
+        return self._by_name[model].get(name) or self._pending[model].get(name)
+
+
+def get_name_resolver(context):
+    """Returns the resolver shared by every serializer of the current request."""
+    request = context.get("request")
+    if request is None:
+        return context.setdefault("name_resolver", RelatedNameResolver())
+
+    if not hasattr(request, "_name_resolver"):
+        request._name_resolver = RelatedNameResolver()
+    return request._name_resolver
@@ -0,0 +1,67 @@
+import csv
+from itertools import islice
+
+import orjson
+
+from apps.api.custom.renderers import dumps
+from apps.common.middleware.thread_local import (
+    delete_current_user,
+    write_current_user,
+)
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Yields lists of up to ``chunk_size`` objects from a server-side cursor.
+
+    Prefetches declared on the queryset are run once per chunk.
+    """
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def serialize_chunks(queryset, serializer_class, context, chunk_size):
+    for chunk in iterate_in_chunks(queryset, chunk_size):
+        yield from serializer_class(chunk, many=True, context=context).data
+
+
+def as_user(user, rows):
+    """
+    Runs a streaming generator with ``user`` as the thread-local user.
+
+    ThreadLocalMiddleware forgets the request before a streaming body is
+    consumed, which would leave the user-scoped managers without a user.
+    """
+    write_current_user(user)
+    try:
+        yield from rows
+    finally:
+        delete_current_user()
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield dumps(row, orjson.OPT_APPEND_NEWLINE)
+
+
+def _csv_value(value):
+    if isinstance(value, dict):
+        return value.get("name", value.get("amount", value.get("id")))
+    if isinstance(value, list):
+        return ", ".join(str(_csv_value(item)) for item in value)
+    return value
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row.get(column)) for column in columns])
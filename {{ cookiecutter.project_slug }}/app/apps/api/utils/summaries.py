@@ -0,0 +1,84 @@
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from apps.api.fields.decimals import format_decimal
+from apps.transactions.models import Transaction
+
+# group_by option -> (lookup of the grouped value, {output key: lookup})
+GROUPINGS = {
+    "month": ("month", {}),
+    "reference_date": ("reference_date", {}),
+    "category": ("category_id", {"name": "category__name"}),
+    "account": ("account_id", {"name": "account__name"}),
+    "tag": ("tags__id", {"name": "tags__name"}),
+    "entity": ("entities__id", {"name": "entities__name"}),
+    "currency": (
+        "account__currency_id",
+        {
+            "code": "account__currency__code",
+            "decimal_places": "account__currency__decimal_places",
+        },
+    ),
+}
+
+
+def summarize_transactions(queryset, group_by):
+    """
+    Sums ``queryset`` grouped by ``group_by`` in a single ``GROUP BY`` query.
+
+    Results are always split by currency, as amounts in different currencies
+    can't be added up. Grouping by tag or entity counts a transaction once
+    for each of its tags or entities, untagged ones being grouped under
+    ``None``.
+    """
+    group_by = [name for name in dict.fromkeys(group_by) if name != "currency"]
+    group_by.append("currency")
+
+    # The visible transactions are selected in a subquery, so joins made by
+    # the manager (e.g. on shared_with) can't multiply the sums
+    transactions = Transaction._base_manager.filter(pk__in=queryset.values("pk"))
+    if "month" in group_by:
+        transactions = transactions.annotate(month=TruncMonth("date"))
+
+    lookups = []
+    for name in group_by:
+        lookup, details = GROUPINGS[name]
+        lookups += [lookup, *details.values()]
+
+    rows = (
+        transactions.values(*lookups)
+        .annotate(
+            income=Sum("amount", filter=Q(type=Transaction.Type.INCOME)),
+            expense=Sum("amount", filter=Q(type=Transaction.Type.EXPENSE)),
+            count=Count("id"),
+        )
+        .order_by(*lookups)
+    )
+
+    results = []
+    for row in rows:
+        result = {}
+        for name in group_by:
+            lookup, details = GROUPINGS[name]
+            if not details:
+                result[name] = row[lookup]
+            elif row[lookup] is None:
+                result[name] = None
+            else:
+                result[name] = {
+                    "id": row[lookup],
+                    **{key: row[value] for key, value in details.items()},
+                }
+
+        places = row["account__currency__decimal_places"]
+        income = row["income"] or 0
+        expense = row["expense"] or 0
+        result.update(
+            income=format_decimal(income, places),
+            expense=format_decimal(expense, places),
+            total=format_decimal(income - expense, places),
+            count=row["count"],
+        )
+        results.append(result)
+
+    return results
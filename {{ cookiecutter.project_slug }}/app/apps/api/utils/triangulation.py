@@ -0,0 +1,151 @@
+import datetime
+import threading
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+
+from django.utils import timezone
+
+
+def as_day(value):
+    if isinstance(value, datetime.datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _direct_rates(pairs, day):
+    """
+    The rate each pair has on ``day`` (its closest one in time) and how far
+    from ``day`` it was set, in seconds.
+    """
+    timestamp = timezone.make_aware(
+        datetime.datetime.combine(day, datetime.time.min)
+    ).timestamp()
+    rates = {}
+    for key, pair in pairs.items():
+        nearest = pair.nearest(timestamp)
+        if nearest is not None:
+            rates[key] = nearest
+    return rates
+
+
+class DailyRateMatrix:
+    """Conversion rate between every two connected currencies on a day."""
+
+    __slots__ = ("index", "rows", "direct_rates", "generation")
+
+    def __init__(self, direct_rates, generation):
+        self.direct_rates = direct_rates
+        self.generation = generation
+
+        neighbors = defaultdict(list)
+        for (low_id, high_id), (rate, age) in direct_rates.items():
+            neighbors[low_id].append((high_id, rate, age))
+            neighbors[high_id].append((low_id, 1 / rate, age))
+
+        currencies = sorted(neighbors)
+        self.index = {currency: i for i, currency in enumerate(currencies)}
+        self.rows = [self._paths_from(source, neighbors) for source in currencies]
+
+    def _paths_from(self, source, neighbors):
+        """
+        Rates from ``source`` to every reachable currency, through the paths
+        with the fewest hops. Among those, the path whose oldest rate is the
+        closest to the day wins.
+        """
+        row = [None] * len(self.index)
+        row[self.index[source]] = Decimal("1")
+        ages = {source: 0}
+
+        frontier = [source]
+        while frontier:
+            reached = {}
+            for currency in frontier:
+                rate = row[self.index[currency]]
+                for other, edge_rate, edge_age in neighbors[currency]:
+                    if other in ages:
+                        continue
+                    age = max(ages[currency], edge_age)
+                    if other not in reached or age < reached[other][1]:
+                        reached[other] = (rate * edge_rate, age)
+
+            for other, (rate, age) in reached.items():
+                row[self.index[other]] = rate
+                ages[other] = age
+            frontier = list(reached)
+
+        return row
+
+    def rate(self, from_id, to_id) -> Decimal | None:
+        if from_id == to_id:
+            return Decimal("1")
+        i, j = self.index.get(from_id), self.index.get(to_id)
+        if i is None or j is None:
+            return None
+        return self.rows[i][j]
+
+
+class RateMatrix:
+    """
+    Daily conversion matrices over every currency with exchange rates.
+
+    A day's matrix is built on first use from the closest rate of each pair,
+    and is an O(1) lookup afterwards. When rates change, a cached day is
+    only rebuilt if the rates it was built from changed, so adding a rate
+    only rebuilds the days around it.
+    """
+
+    cache_size = 366
+
+    def __init__(self, rate_index):
+        self._rate_index = rate_index
+        self._days = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, date):
+        day = as_day(date)
+        return self.get_many([day])[day]
+
+    def get_many(self, dates):
+        """
+        Matrices for every day of ``dates``, by day, reading the rates once.
+
+        Days missing from the cache are built in the same pass. They're only
+        kept if they all fit in it, so a long range doesn't evict the days
+        conversions keep using.
+        """
+        days = {as_day(date) for date in dates}
+        generation, pairs = self._rate_index.get_all_pairs()
+
+        with self._lock:
+            cached = {day: self._days.get(day) for day in days}
+
+        matrices = {}
+        for day, matrix in cached.items():
+            if matrix is None or matrix.generation != generation:
+                direct_rates = _direct_rates(pairs, day)
+                if matrix is not None and matrix.direct_rates == direct_rates:
+                    matrix.generation = generation
+                else:
+                    matrix = DailyRateMatrix(direct_rates, generation)
+            matrices[day] = matrix
+
+        if len(matrices) <= self.cache_size:
+            with self._lock:
+                for day in sorted(matrices):
+                    self._days[day] = matrices[day]
+                    self._days.move_to_end(day)
+                while len(self._days) > self.cache_size:
+                    self._days.popitem(last=False)
+        return matrices
+
+    def rate(self, from_id, to_id, date) -> Decimal | None:
+        if from_id == to_id:
+            return Decimal("1")
+        return self.get(date).rate(from_id, to_id)
+
+    def rates(self, from_id, to_id, dates) -> list[Decimal | None]:
+        """Like ``rate`` for each of ``dates``, see ``get_many``."""
+        if from_id == to_id:
+            return [Decimal("1")] * len(dates)
+        matrices = self.get_many(dates)
+        return [matrices[as_day(date)].rate(from_id, to_id) for date in dates]
@@ -0,0 +1,56 @@
+from time import time
+
+from cachalot.settings import cachalot_settings
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _tables(models):
+    for model in models:
+        yield model._meta.db_table
+        for field in model._meta.many_to_many:
+            yield field.remote_field.through._meta.db_table
+
+
+def get_last_invalidation(tables):
+    """
+    Like ``cachalot.api.get_last_invalidation``, except that a table without
+    an invalidation record counts as invalidated now.
+
+    Records are culled from the cache like any other entry, and the latest
+    write must never disappear from the version because of it. The missing
+    records are stored back, as cachalot does when it runs a query.
+    """
+    cache = caches[cachalot_settings.CACHALOT_CACHE]
+    get_table_cache_key = cachalot_settings.CACHALOT_TABLE_KEYGEN
+
+    last_invalidation = 0.0
+    for db_alias in settings.DATABASES:
+        keys = [get_table_cache_key(db_alias, table) for table in tables]
+        invalidations = cache.get_many(keys)
+
+        missing = [key for key in keys if key not in invalidations]
+        if missing:
+            now = time()
+            cache.set_many(
+                {key: now for key in missing}, cachalot_settings.CACHALOT_TIMEOUT
+            )
+            invalidations.update(dict.fromkeys(missing, now))
+
+        last_invalidation = max([last_invalidation, *invalidations.values()])
+    return last_invalidation
+
+
+def get_data_version(*models):
+    """
+    Cheap version string for the rows of ``models`` (and their M2M tables).
+
+    Built from the invalidation timestamps cachalot keeps in the shared cache
+    for every table written through the ORM, bulk ``update()`` and
+    ``delete()`` included, so reading it costs no database query. Returns
+    ``None`` when cachalot is disabled and no version can be trusted.
+    """
+    if not cachalot_settings.CACHALOT_ENABLED:
+        return None
+
+    return repr(get_last_invalidation(sorted(set(_tables(models)))))
@@ -2,3 +2,8 @@ from .transactions import *
 from .accounts import *
 from .currencies import *
 from .dca import *
+from .jobs import *
+from .sync import *
+from .tokens import *
+from .schema import *
+from .batch import *
@@ -1,27 +1,48 @@
 from rest_framework import viewsets
 
+from apps.api.custom.mixins import (
+    ConditionalGetMixin,
+    IdempotencyMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+)
 from apps.api.custom.pagination import CustomPageNumberPagination
 from apps.accounts.models import AccountGroup, Account
+from apps.currencies.models import Currency
 from apps.api.serializers import AccountGroupSerializer, AccountSerializer
 
 
-class AccountGroupViewSet(viewsets.ModelViewSet):
+class AccountGroupViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = AccountGroup.objects.all()
     serializer_class = AccountGroupSerializer
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self):
-        return AccountGroup.objects.all().order_by("id")
+        return AccountGroup.objects.all().order_by("id").prefetch_related("shared_with")
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
     pagination_class = CustomPageNumberPagination
+    etag_models = [Account, AccountGroup, Currency]
 
     def get_queryset(self):
-        return (
-            Account.objects.all()
-            .order_by("id")
-            .select_related("group", "currency", "exchange_currency")
-        )
+        queryset = Account.objects.all().order_by("id")
+
+        for field in ("group", "currency", "exchange_currency"):
+            if self.field_requested(field):
+                queryset = queryset.select_related(field)
+        if self.field_requested("group"):
+            # The nested group lists who it's shared with
+            queryset = queryset.prefetch_related("group__shared_with")
+
+        return queryset
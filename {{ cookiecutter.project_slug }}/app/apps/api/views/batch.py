@@ -0,0 +1,76 @@
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.api.permissions import NotInDemoMode
+from apps.api.serializers import BatchSerializer
+
+
+class BatchViewSet(viewsets.ViewSet):
+    """
+    Runs several GET requests against this API in one call.
+
+    ``requests`` is a list of paths relative to ``/api/``, like
+    ``"accounts/?page_size=100"``. They run in this process with the
+    caller's authentication, and their responses are returned in the same
+    order as ``{"path", "status", "body"}``.
+    """
+
+    permission_classes = [NotInDemoMode, IsAuthenticated]
+    urlconf = "apps.api.urls"
+
+    def create(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return Response(
+            [
+                self.run_request(request, path)
+                for path in serializer.validated_data["requests"]
+            ]
+        )
+
+    def run_request(self, request, path):
+        url = urlsplit(path)
+        route = "/" + url.path.lstrip("/").removeprefix("api/")
+
+        try:
+            match = resolve(route, urlconf=self.urlconf)
+        except Resolver404:
+            return self.error(path, status.HTTP_404_NOT_FOUND, _("Not found."))
+
+        subrequest = HttpRequest()
+        subrequest.method = "GET"
+        subrequest.path = subrequest.path_info = "/api" + route
+        subrequest.META = {
+            key: value
+            for key, value in request.META.items()
+            if not key.startswith("wsgi.")
+            and key not in ("CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_IF_NONE_MATCH")
+        }
+        subrequest.META.update(
+            REQUEST_METHOD="GET", PATH_INFO=subrequest.path, QUERY_STRING=url.query
+        )
+        subrequest.GET = QueryDict(url.query)
+        subrequest.user = request.user
+        # Authenticated once for the whole batch
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        if not isinstance(response, Response):
+            return self.error(
+                path,
+                status.HTTP_406_NOT_ACCEPTABLE,
+                _("This endpoint can't be used in a batch."),
+            )
+
+        return {"path": path, "status": response.status_code, "body": response.data}
+
+    def error(self, path, status_code, detail):
+        return {"path": path, "status": status_code, "body": {"detail": detail}}
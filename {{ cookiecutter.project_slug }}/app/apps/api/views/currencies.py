@@ -1,16 +1,92 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from apps.api.serializers import ExchangeRateSerializer
+from apps.api.custom.mixins import (
+    ConditionalGetMixin,
+    IdempotencyMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+)
+from apps.api.filters import ExchangeRateFilter
+from apps.api.fields.decimals import format_decimal
+from apps.api.serializers import ExchangeRateLookupSerializer, ExchangeRateSerializer
 from apps.api.serializers import CurrencySerializer
 from apps.currencies.models import Currency
 from apps.currencies.models import ExchangeRate
+from apps.api.utils.exchange_rates import rate_index, rate_matrix
 
 
-class CurrencyViewSet(viewsets.ModelViewSet):
+class CurrencyViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
 
+    def get_queryset(self):
+        return Currency.objects.all().order_by("id")
 
-class ExchangeRateViewSet(viewsets.ModelViewSet):
+
+class ExchangeRateViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = ExchangeRate.objects.all()
     serializer_class = ExchangeRateSerializer
+    filterset_class = ExchangeRateFilter
+    etag_models = [ExchangeRate, Currency]
+
+    def get_queryset(self):
+        queryset = ExchangeRate.objects.all().order_by("id")
+
+        for field in ("from_currency", "to_currency"):
+            if self.field_requested(field):
+                queryset = queryset.select_related(field)
+
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def rate_at(self, request):
+        """
+        Rate between two currencies at one or more dates.
+
+        ``date`` takes a comma separated list of dates or datetimes, while
+        ``start`` and ``end`` ask for every day in between. Each date gets
+        the rate closest to it in time, like conversions in the app. Pairs
+        without rates are converted through other currencies, or get
+        ``null`` when no path exists.
+        """
+        lookup = ExchangeRateLookupSerializer(data=request.query_params)
+        lookup.is_valid(raise_exception=True)
+        data = lookup.validated_data
+
+        rates = rate_index.rates_at(
+            data["from_currency"], data["to_currency"], data["dates"]
+        )
+        # Dates without a direct rate are triangulated in one pass
+        missing = [i for i, rate in enumerate(rates) if rate is None]
+        if missing:
+            triangulated = rate_matrix.rates(
+                data["from_currency"],
+                data["to_currency"],
+                [data["dates"][i] for i in missing],
+            )
+            for i, rate in zip(missing, triangulated):
+                rates[i] = rate
+        return Response(
+            {
+                "from_currency": data["from_currency"],
+                "to_currency": data["to_currency"],
+                "results": [
+                    {"date": date.isoformat(), "rate": format_decimal(rate)}
+                    for date, rate in zip(data["dates"], rates)
+                ],
+            }
+        )
@@ -1,13 +1,36 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+
+from apps.api.custom.mixins import (
+    ConditionalGetMixin,
+    IdempotencyMixin,
+    SparseFieldsetMixin,
+)
+from apps.api.filters import DCAEntryFilter
+from apps.currencies.models import Currency, ExchangeRate
 from apps.dca.models import DCAStrategy, DCAEntry
 from apps.api.serializers import DCAStrategySerializer, DCAEntrySerializer
 
 
-class DCAStrategyViewSet(viewsets.ModelViewSet):
+class DCAStrategyViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = DCAStrategy.objects.all()
     serializer_class = DCAStrategySerializer
+    etag_models = [DCAStrategy, DCAEntry, Currency, ExchangeRate]
+
+    def get_queryset(self):
+        queryset = (
+            DCAStrategy.objects.all()
+            .order_by("id")
+            .select_related("target_currency", "payment_currency")
+        )
+
+        if self.field_requested("entries"):
+            queryset = queryset.prefetch_related("entries")
+
+        return queryset
 
     @action(detail=True, methods=["get"])
     def investment_frequency(self, request, pk=None):
@@ -29,13 +52,21 @@ class DCAStrategyViewSet(viewsets.ModelViewSet):
         return Response({"price": None, "date": None})
 
 
-class DCAEntryViewSet(viewsets.ModelViewSet):
+class DCAEntryViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = DCAEntry.objects.all()
     serializer_class = DCAEntrySerializer
+    filterset_class = DCAEntryFilter
+    etag_models = [DCAEntry, DCAStrategy, Currency, ExchangeRate]
 
     def get_queryset(self):
-        queryset = DCAEntry.objects.all()
-        strategy_id = self.request.query_params.get("strategy", None)
-        if strategy_id is not None:
-            queryset = queryset.filter(strategy_id=strategy_id)
-        return queryset
+        return (
+            DCAEntry.objects.all()
+            .order_by("id")
+            .select_related(
+                "strategy",
+                "strategy__target_currency",
+                "strategy__payment_currency",
+            )
+        )
@@ -0,0 +1,39 @@
+from procrastinate.contrib.django.models import ProcrastinateJob
+from rest_framework import viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.api.permissions import NotInDemoMode, TokenHasScope
+from apps.api.tasks import (
+    get_job_progress,
+    materialize_installment_plan,
+    materialize_recurring_transaction,
+)
+
+
+class JobViewSet(viewsets.ViewSet):
+    """
+    Status of the background jobs started by API writes, such as the
+    creation of an installment plan's transactions.
+    """
+
+    permission_classes = [NotInDemoMode, IsAuthenticated, TokenHasScope]
+    lookup_value_regex = r"\d+"
+    task_names = [
+        materialize_installment_plan.name,
+        materialize_recurring_transaction.name,
+    ]
+
+    def retrieve(self, request, pk=None):
+        job = (
+            ProcrastinateJob.objects.filter(
+                pk=pk, task_name__in=self.task_names, args__user_id=request.user.pk
+            )
+            .values("id", "task_name", "status", "attempts", "scheduled_at")
+            .first()
+        )
+        if job is None:
+            raise NotFound()
+
+        return Response({**job, "progress": get_job_progress(job["id"])})
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an ``Accept-Encoding`` header allows a gzipped response, by
+    the quality given to ``gzip`` (or ``x-gzip``), else to ``*``.
+    """
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+
+    for name in ("gzip", "x-gzip", "*"):
+        if name in qualities:
+            return qualities[name] > 0
+    return False
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving a schema generated once per ``APP_VERSION``.
+
+    Each format (and ``lang``/``version`` parameter) is generated on first
+    use, or by the ``build_api_schema`` command, and kept gzipped in the
+    cache with its ETag. It's always generated again while ``DEBUG`` is on.
+    Without an ``APP_VERSION``, a deploy can't be told apart from the
+    previous one, so the schema is only kept for ``unversioned_timeout``.
+    """
+
+    unversioned_timeout = 300
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            return super().get(request, *args, **kwargs)
+
+        entry = cache.get(self.get_cache_key(request))
+        if entry is None:
+            entry = self.build_entry(request, *args, **kwargs)
+            if entry is None:
+                return super().get(request, *args, **kwargs)
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if entry["etag"] in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        elif accepts_gzip(request.headers.get("Accept-Encoding", "")):
+            response = HttpResponse(
+                entry["content"], content_type=entry["content_type"]
+            )
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                gzip.decompress(entry["content"]), content_type=entry["content_type"]
+            )
+
+        response["ETag"] = entry["etag"]
+        response["Content-Disposition"] = entry["content_disposition"]
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def get_cache_key(self, request):
+        parts = [
+            settings.APP_VERSION,
+            request.accepted_renderer.format,
+            request.GET.get("lang", "") if settings.USE_I18N else "",
+            request.GET.get("version", ""),
+        ]
+        return "api_schema_%s" % hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def build_entry(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return None
+
+        renderer = request.accepted_renderer
+        content = renderer.render(
+            response.data, request.accepted_media_type, self.get_renderer_context()
+        )
+        if isinstance(content, str):
+            content = content.encode(renderer.charset or "utf-8")
+
+        content_type = request.accepted_media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+
+        entry = {
+            "etag": '"%s"' % hashlib.sha256(content).hexdigest(),
+            "content": gzip.compress(content),
+            "content_type": content_type,
+            "content_disposition": response["Content-Disposition"],
+        }
+        cache.set(self.get_cache_key(request), entry, self.get_cache_timeout())
+        return entry
+
+    def get_cache_timeout(self):
+        if settings.APP_VERSION == "unknown":
+            return self.unversioned_timeout
+        return None
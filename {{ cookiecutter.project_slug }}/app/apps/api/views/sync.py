@@ -0,0 +1,130 @@
+import time
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.api.custom.exceptions import SyncTokenExpired
+from apps.api.models import ChangeLog
+from apps.api.permissions import NotInDemoMode, TokenHasScope
+from apps.api.views.accounts import AccountViewSet
+from apps.api.views.currencies import CurrencyViewSet, ExchangeRateViewSet
+from apps.api.views.transactions import (
+    TransactionCategoryViewSet,
+    TransactionEntityViewSet,
+    TransactionTagViewSet,
+    TransactionViewSet,
+)
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    Changes made since a token returned by a previous call.
+
+    Without ``since``, only returns a token to start from: download the
+    collections normally, then keep calling with the last token received.
+    Each call reads the change log from the token's position, so its cost
+    depends on the number of changes and not on the size of the data.
+    """
+
+    permission_classes = [NotInDemoMode, IsAuthenticated, TokenHasScope]
+    page_size = 1000
+    resources = {
+        "transactions": TransactionViewSet,
+        "accounts": AccountViewSet,
+        "categories": TransactionCategoryViewSet,
+        "tags": TransactionTagViewSet,
+        "entities": TransactionEntityViewSet,
+        "currencies": CurrencyViewSet,
+        "exchange_rates": ExchangeRateViewSet,
+    }
+
+    def list(self, request):
+        horizon = ChangeLog.get_horizon()
+        since = request.query_params.get("since")
+        if not since:
+            return Response(
+                {"token": self.make_token(horizon, 0), "has_more": False, "changes": {}}
+            )
+
+        txid, last_id = self.parse_token(since)
+        entries = list(
+            ChangeLog.for_user(request.user)
+            .filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=last_id), txid__lt=horizon)
+            .order_by("txid", "id")
+            .values_list("txid", "id", "model", "object_id", "action")[
+                : self.page_size + 1
+            ]
+        )
+
+        has_more = len(entries) > self.page_size
+        if has_more:
+            entries = entries[: self.page_size]
+            token = self.make_token(*entries[-1][:2])
+        else:
+            token = self.make_token(*max((horizon, 0), (txid, last_id)))
+
+        return Response(
+            {
+                "token": token,
+                "has_more": has_more,
+                "changes": self.get_changes(request, entries),
+            }
+        )
+
+    def get_changes(self, request, entries):
+        # Only the last change to each object matters, except that an object
+        # created and then updated is still reported as created
+        actions = {}
+        for _txid, _id, model, object_id, action in entries:
+            objects = actions.setdefault(model, {})
+            if not (
+                objects.get(object_id) == ChangeLog.Action.CREATED
+                and action == ChangeLog.Action.UPDATED
+            ):
+                objects[object_id] = action
+
+        changes = {}
+        for name, viewset_class in self.resources.items():
+            objects = actions.get(viewset_class.queryset.model._meta.label_lower)
+            if not objects:
+                continue
+
+            viewset = viewset_class(
+                request=request, args=(), kwargs={}, format_kwarg=None, action="list"
+            )
+            instances = list(
+                viewset.get_queryset().filter(
+                    pk__in=[
+                        pk
+                        for pk, action in objects.items()
+                        if action != ChangeLog.Action.DELETED
+                    ]
+                )
+            )
+            data = viewset.get_serializer(instances, many=True).data
+
+            result = {"created": [], "updated": [], "deleted": []}
+            for instance, row in zip(instances, data):
+                result[objects.pop(instance.pk)].append(row)
+            # Whatever is left was deleted, or the user lost access to it
+            result["deleted"] = list(objects)
+            changes[name] = result
+
+        return changes
+
+    def make_token(self, txid, last_id):
+        return f"{txid}-{last_id}-{int(time.time())}"
+
+    def parse_token(self, token):
+        try:
+            txid, last_id, issued_at = map(int, token.split("-"))
+        except ValueError:
+            raise ValidationError({"since": _("Invalid token.")})
+
+        if issued_at < time.time() - ChangeLog.RETENTION.total_seconds():
+            raise SyncTokenExpired()
+        return txid, last_id
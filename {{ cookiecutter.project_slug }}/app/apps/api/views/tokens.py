@@ -0,0 +1,28 @@
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from apps.api.models import ApiToken
+from apps.api.permissions import NotInDemoMode, TokenHasScope
+from apps.api.serializers import ApiTokenSerializer
+
+
+class ApiTokenViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API tokens of the current user. A token's key is only returned when it's
+    created, and deleting a token revokes it.
+    """
+
+    serializer_class = ApiTokenSerializer
+    permission_classes = [NotInDemoMode, IsAuthenticated, TokenHasScope]
+
+    def get_queryset(self):
+        return ApiToken.objects.filter(user=self.request.user).order_by("-id")
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
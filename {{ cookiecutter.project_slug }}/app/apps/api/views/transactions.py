@@ -1,14 +1,57 @@
-from rest_framework import viewsets
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from django_filters.constants import EMPTY_VALUES
+from django_filters.widgets import SuffixedMultiWidget
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
-from apps.api.custom.pagination import CustomPageNumberPagination
+from apps.api.custom.mixins import (
+    ConditionalGetMixin,
+    IdempotencyMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+)
+from apps.api.custom.pagination import (
+    CustomPageNumberPagination,
+    KeysetOptInPagination,
+)
+from apps.api.filters import (
+    InstallmentPlanFilter,
+    RecurringTransactionFilter,
+    TransactionFilter,
+)
 from apps.api.serializers import (
+    TransactionBulkSelectionSerializer,
+    TransactionBulkUpdateSerializer,
     TransactionSerializer,
+    TransactionUpsertSerializer,
     TransactionCategorySerializer,
     TransactionTagSerializer,
     InstallmentPlanSerializer,
     TransactionEntitySerializer,
     RecurringTransactionSerializer,
 )
+from apps.api.signals import (
+    transactions_created,
+    transactions_deleted,
+    transactions_updated,
+)
+from apps.api.tasks import send_transaction_event
+from apps.api.utils.bulk import delete_transactions, update_transactions
+from apps.api.utils.related_names import get_name_resolver
+from apps.api.utils.streaming import (
+    as_user,
+    csv_lines,
+    ndjson_lines,
+    serialize_chunks,
+)
+from apps.api.utils.summaries import GROUPINGS, summarize_transactions
+from apps.accounts.models import Account, AccountGroup
+from apps.currencies.models import Currency, ExchangeRate
 from apps.transactions.models import (
     Transaction,
     TransactionCategory,
@@ -17,70 +60,479 @@ from apps.transactions.models import (
     TransactionEntity,
     RecurringTransaction,
 )
-from apps.rules.signals import transaction_updated, transaction_created
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+def _filter_keys(filterset):
+    """Keys ``filterset`` reads, with the suffixes of range filters."""
+    keys = set()
+    for name, field in filterset.form.fields.items():
+        widget = field.widget
+        if isinstance(widget, SuffixedMultiWidget):
+            keys.update(widget.suffixed(name, suffix) for suffix in widget.suffixes)
+        else:
+            keys.add(name)
+    return keys
+
+
+class TransactionViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
-    pagination_class = CustomPageNumberPagination
+    filterset_class = TransactionFilter
+    pagination_class = KeysetOptInPagination
+    keyset_orderings = {
+        "-id": ("-id",),
+        "date": ("date", "id"),
+        "-date": ("-date", "-id"),
+    }
+    export_chunk_size = 2000
+    bulk_max_size = 5000
+    bulk_update_fields = [
+        "type",
+        "is_paid",
+        "reference_date",
+        "description",
+        "notes",
+        "category",
+        "tags",
+        "entities",
+    ]
+    etag_models = [
+        Transaction,
+        Account,
+        AccountGroup,
+        Currency,
+        ExchangeRate,
+        TransactionCategory,
+        TransactionTag,
+        TransactionEntity,
+        InstallmentPlan,
+        RecurringTransaction,
+    ]
 
     def perform_create(self, serializer):
         instance = serializer.save()
-        transaction_created.send(sender=instance)
+        send_transaction_event(instance, "created")
 
     def perform_update(self, serializer):
         instance = serializer.save()
-        transaction_updated.send(sender=instance)
+        send_transaction_event(instance, "updated")
 
     def partial_update(self, request, *args, **kwargs):
         kwargs["partial"] = True
         return self.update(request, *args, **kwargs)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Creates a list of transactions in one request.
+
+        The batch is validated as a whole and inserted in a single database
+        transaction, so nothing is created if any item is invalid. Errors are
+        returned as a list with one entry per submitted item.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_size
+        )
+        serializer.is_valid(raise_exception=True)
+        transactions = serializer.save()
+        transactions_created.send(
+            sender=Transaction, pks=[transaction.pk for transaction in transactions]
+        )
+        for transaction in transactions:
+            send_transaction_event(transaction, "created")
+
+        created = self.get_queryset().in_bulk([t.pk for t in transactions])
+        serializer = self.get_serializer(
+            [created[t.pk] for t in transactions if t.pk in created], many=True
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """
+        Applies the same ``changes`` to many transactions at once.
+
+        Transactions are selected by ``ids``, by ``filter`` (the list filters,
+        e.g. ``{"date_after": "2024-01-01", "category": "3"}``) or both. The
+        change is written with set-based queries, and a single
+        ``transactions_updated`` signal is sent for the whole batch.
+        """
+        selection = TransactionBulkUpdateSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+
+        changes = selection.validated_data["changes"]
+        unsupported = set(changes) - set(self.bulk_update_fields)
+        if unsupported:
+            raise ValidationError(
+                {
+                    "changes": _("These fields can't be changed in bulk: %(fields)s.")
+                    % {"fields": ", ".join(sorted(unsupported))}
+                }
+            )
+        serializer = self.get_serializer(data=changes, partial=True)
+        if not serializer.is_valid():
+            raise ValidationError({"changes": serializer.errors})
+
+        pks = self.get_bulk_selection(selection.validated_data)
+        with db_transaction.atomic():
+            get_name_resolver(serializer.context).save_pending()
+            update_transactions(pks, serializer.validated_data)
+        transactions_updated.send(
+            sender=Transaction, pks=pks, fields=sorted(serializer.validated_data)
+        )
+        return Response({"updated": len(pks)})
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Deletes many transactions at once, selected like in ``bulk_update``.
+
+        Transactions are only marked as deleted when soft delete is enabled.
+        A single ``transactions_deleted`` signal is sent for the whole batch.
+        """
+        selection = TransactionBulkSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+
+        pks = self.get_bulk_selection(selection.validated_data)
+        delete_transactions(pks)
+        transactions_deleted.send(
+            sender=Transaction, pks=pks, soft=settings.ENABLE_SOFT_DELETE
+        )
+        return Response({"deleted": len(pks)})
+
+    @action(detail=False, methods=["post"])
+    def upsert(self, request):
+        """
+        Creates or updates a list of transactions by their ``external_id``.
+
+        ``external_id`` is any id chosen by the client, unique per user.
+        Transactions already imported with it get the fields the item sends
+        (and are restored if they were deleted), the others are created, so a
+        batch can be sent again without looking it up first.
+        """
+        serializer = TransactionUpsertSerializer(
+            data=request.data,
+            many=True,
+            max_length=self.bulk_max_size,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        external_ids = [data["external_id"] for data in serializer.validated_data]
+        fields = sorted(
+            {name for data in serializer.validated_data for name in data}
+            - {"external_id"}
+        )
+        transactions, created = serializer.upsert(serializer.validated_data)
+
+        transactions_created.send(
+            sender=Transaction,
+            pks=[t.pk for t, is_new in zip(transactions, created) if is_new],
+        )
+        transactions_updated.send(
+            sender=Transaction,
+            pks=[t.pk for t, is_new in zip(transactions, created) if not is_new],
+            fields=fields,
+        )
+        for transaction, is_new in zip(transactions, created):
+            send_transaction_event(transaction, "created" if is_new else "updated")
+
+        return Response(
+            {
+                "created": created.count(True),
+                "updated": created.count(False),
+                "results": [
+                    {
+                        "external_id": external_id,
+                        "id": transaction.pk,
+                        "created": is_new,
+                    }
+                    for external_id, transaction, is_new in zip(
+                        external_ids, transactions, created
+                    )
+                ],
+            }
+        )
+
+    def get_bulk_selection(self, selection):
+        queryset = self.get_queryset()
+
+        if "ids" in selection:
+            queryset = queryset.filter(pk__in=selection["ids"])
+
+        if "filter" in selection:
+            # Lists are accepted for the comma separated filters
+            data = {
+                key: ",".join(map(str, value)) if isinstance(value, list) else value
+                for key, value in selection["filter"].items()
+            }
+            filterset = self.filterset_class(
+                data=data, queryset=queryset, request=self.request
+            )
+            # django-filter ignores what it doesn't know, which would select
+            # every transaction
+            unknown = set(data) - _filter_keys(filterset)
+            if unknown:
+                raise ValidationError(
+                    {
+                        "filter": _("Unknown filters: %(filters)s.")
+                        % {"filters": ", ".join(sorted(unknown))}
+                    }
+                )
+            if not filterset.is_valid():
+                raise ValidationError({"filter": filterset.errors})
+            if all(
+                value in EMPTY_VALUES for value in filterset.form.cleaned_data.values()
+            ):
+                raise ValidationError(
+                    {"filter": _("At least one filter must have a value.")}
+                )
+            queryset = filterset.qs
+
+        return list(queryset.order_by().values_list("pk", flat=True).distinct())
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Streams every matching transaction as NDJSON (default) or CSV.
+
+        Rows are read through a server-side cursor in chunks of
+        ``export_chunk_size``, so memory use doesn't grow with the result.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in ("ndjson", "csv"):
+            raise ValidationError(
+                {"export_format": _("Choose either 'ndjson' or 'csv'.")}
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = serialize_chunks(
+            queryset,
+            self.get_serializer_class(),
+            self.get_serializer_context(),
+            self.export_chunk_size,
+        )
+
+        if export_format == "csv":
+            columns = [
+                name
+                for name, field in self.get_serializer().fields.items()
+                if not field.write_only
+            ]
+            lines = csv_lines(rows, columns)
+            content_type = "text/csv"
+        else:
+            lines = ndjson_lines(rows)
+            content_type = "application/x-ndjson"
+
+        response = StreamingHttpResponse(
+            as_user(request.user, lines), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="transactions.{export_format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        """
+        Totals of the matching transactions, computed by the database.
+
+        ``group_by`` takes a comma separated list of month, reference_date,
+        category, account, currency, tag and entity. Accepts the same filters
+        as the list (``date_after``, ``date_before``, ``type``...). Results are
+        always split by currency.
+        """
+        return self.conditional_response(self.get_summary, request)
+
+    def get_summary(self, request):
+        group_by = [
+            name.strip()
+            for name in request.query_params.get("group_by", "month").split(",")
+            if name.strip()
+        ]
+        if not set(group_by) <= set(GROUPINGS):
+            raise ValidationError(
+                {
+                    "group_by": _("Choose from: %(choices)s.")
+                    % {"choices": ", ".join(GROUPINGS)}
+                }
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(
+            {
+                "group_by": group_by,
+                "results": summarize_transactions(queryset, group_by),
+            }
+        )
+
     def get_queryset(self):
-        return Transaction.objects.all().order_by("-id")
+        queryset = Transaction.objects.all().order_by("-id")
+
+        if self.field_requested("account"):
+            queryset = queryset.select_related(
+                "account",
+                "account__group",
+                "account__currency",
+                "account__exchange_currency",
+            ).prefetch_related("account__group__shared_with")
+        elif self.field_requested("amount") or self.field_requested("exchanged_amount"):
+            queryset = queryset.select_related(
+                "account__currency", "account__exchange_currency"
+            )
+        if self.field_requested("category"):
+            queryset = queryset.select_related("category")
+        if self.field_requested("tags"):
+            queryset = queryset.prefetch_related("tags")
+        if self.field_requested("entities"):
+            queryset = queryset.prefetch_related("entities")
+        if self.field_expanded("installment_plan"):
+            queryset = queryset.select_related(
+                "installment_plan", "installment_plan__category"
+            ).prefetch_related("installment_plan__tags", "installment_plan__entities")
+        if self.field_expanded("recurring_transaction"):
+            queryset = queryset.select_related(
+                "recurring_transaction", "recurring_transaction__category"
+            ).prefetch_related(
+                "recurring_transaction__tags", "recurring_transaction__entities"
+            )
+
+        return queryset
 
 
-class TransactionCategoryViewSet(viewsets.ModelViewSet):
+class TransactionCategoryViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = TransactionCategory.objects.all()
     serializer_class = TransactionCategorySerializer
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self):
-        return TransactionCategory.objects.all().order_by("id")
+        queryset = TransactionCategory.objects.all().order_by("id")
 
+        if self.field_requested("shared_with"):
+            queryset = queryset.prefetch_related("shared_with")
 
-class TransactionTagViewSet(viewsets.ModelViewSet):
+        return queryset
+
+
+class TransactionTagViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = TransactionTag.objects.all()
     serializer_class = TransactionTagSerializer
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self):
-        return TransactionTag.objects.all().order_by("id")
+        queryset = TransactionTag.objects.all().order_by("id")
+
+        if self.field_requested("shared_with"):
+            queryset = queryset.prefetch_related("shared_with")
 
+        return queryset
 
-class TransactionEntityViewSet(viewsets.ModelViewSet):
+
+class TransactionEntityViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    ReferenceDataCacheMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = TransactionEntity.objects.all()
     serializer_class = TransactionEntitySerializer
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self):
-        return TransactionEntity.objects.all().order_by("id")
+        queryset = TransactionEntity.objects.all().order_by("id")
+
+        if self.field_requested("shared_with"):
+            queryset = queryset.prefetch_related("shared_with")
+
+        return queryset
 
 
-class InstallmentPlanViewSet(viewsets.ModelViewSet):
+class InstallmentPlanViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = InstallmentPlan.objects.all()
     serializer_class = InstallmentPlanSerializer
-    pagination_class = CustomPageNumberPagination
+    filterset_class = InstallmentPlanFilter
+    pagination_class = KeysetOptInPagination
+    keyset_orderings = {"-id": ("-id",)}
+    etag_models = [
+        InstallmentPlan,
+        TransactionCategory,
+        TransactionTag,
+        TransactionEntity,
+        Account,
+        AccountGroup,
+        Currency,
+    ]
 
     def get_queryset(self):
-        return InstallmentPlan.objects.all().order_by("-id")
+        queryset = InstallmentPlan.objects.all().order_by("-id")
+
+        if self.field_requested("category"):
+            queryset = queryset.select_related("category")
+        if self.field_requested("tags"):
+            queryset = queryset.prefetch_related("tags")
+        if self.field_requested("entities"):
+            queryset = queryset.prefetch_related("entities")
+        if self.field_expanded("account"):
+            queryset = queryset.select_related(
+                "account",
+                "account__group",
+                "account__currency",
+                "account__exchange_currency",
+            ).prefetch_related("account__group__shared_with")
+
+        return queryset
 
 
-class RecurringTransactionViewSet(viewsets.ModelViewSet):
+class RecurringTransactionViewSet(
+    IdempotencyMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     queryset = RecurringTransaction.objects.all()
     serializer_class = RecurringTransactionSerializer
-    pagination_class = CustomPageNumberPagination
+    filterset_class = RecurringTransactionFilter
+    pagination_class = KeysetOptInPagination
+    keyset_orderings = {"-id": ("-id",)}
+    etag_models = [
+        RecurringTransaction,
+        TransactionCategory,
+        TransactionTag,
+        TransactionEntity,
+        Account,
+        AccountGroup,
+        Currency,
+    ]
 
     def get_queryset(self):
-        return RecurringTransaction.objects.all().order_by("-id")
+        queryset = RecurringTransaction.objects.all().order_by("-id")
+
+        if self.field_requested("category"):
+            queryset = queryset.select_related("category")
+        if self.field_requested("tags"):
+            queryset = queryset.prefetch_related("tags")
+        if self.field_requested("entities"):
+            queryset = queryset.prefetch_related("entities")
+        if self.field_expanded("account"):
+            queryset = queryset.select_related(
+                "account",
+                "account__group",
+                "account__currency",
+                "account__exchange_currency",
+            ).prefetch_related("account__group__shared_with")
+
+        return queryset
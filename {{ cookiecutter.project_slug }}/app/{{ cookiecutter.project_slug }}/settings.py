@@ -399,12 +399,24 @@ if DEBUG:
 
 
 REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "apps.api.authentication.ApiTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
     # Use Django's standard `django.contrib.auth` permissions,
     # or allow read-only access for unauthenticated users.
     "DEFAULT_PERMISSION_CLASSES": [
         "apps.api.permissions.NotInDemoMode",
-        "rest_framework.permissions.DjangoModelPermissions",
+        "apps.api.permissions.TokenHasScope",
+        "apps.api.permissions.CachedDjangoModelPermissions",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.api.custom.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "apps.api.custom.renderers.ColumnarJSONRenderer",
     ],
+    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -539,5 +551,11 @@ PWA_SERVICE_WORKER_PATH = BASE_DIR / "templates" / "pwa" / "serviceworker.js"
 ENABLE_SOFT_DELETE = os.getenv("ENABLE_SOFT_DELETE", "false").lower() == "true"
 CHECK_FOR_UPDATES = os.getenv("CHECK_FOR_UPDATES", "true").lower() == "true"
 KEEP_DELETED_TRANSACTIONS_FOR = int(os.getenv("KEEP_DELETED_ENTRIES_FOR", "365"))
+DEFER_TRANSACTION_RULES = (
+    os.getenv("DEFER_TRANSACTION_RULES", "false").lower() == "true"
+)
+TRANSACTION_RULES_COALESCE_SECONDS = int(
+    os.getenv("TRANSACTION_RULES_COALESCE_SECONDS", "5")
+)
 APP_VERSION = os.getenv("APP_VERSION", "unknown")
 DEMO = os.getenv("DEMO", "false").lower() == "true"
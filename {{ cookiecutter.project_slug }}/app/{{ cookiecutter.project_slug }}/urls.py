@@ -17,12 +17,11 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from allauth.socialaccount.providers.openid_connect.views import login, callback
 
+from apps.api.views import CachedSpectacularAPIView
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -32,7 +31,7 @@ urlpatterns = [
     path("", include("pwa.urls")),
     # path("api/", include("rest_framework.urls")),
     path("api/", include("apps.api.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", CachedSpectacularAPIView.as_view(), name="schema"),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="schema"),